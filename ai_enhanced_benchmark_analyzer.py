@@ -4,29 +4,157 @@ AI-Enhanced Benchmark Analyzer
 Integrates AI categorization to improve benchmark determination, especially for MSP hidden costs
 """
 
+import asyncio
+import hashlib
 import json
 import os
 import re
 from datetime import datetime
-from collections import defaultdict
 import anthropic
+import ijson
+import numpy as np
+import orjson
+import pandas as pd
 import logging
+import vendor_consolidation
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Managed service providers whose invoices commonly bundle hidden costs
+MSP_VENDORS = ["Synoptek", "Harman", "Markov Processes"]
+
+# Records whose spend exceeds the typical benchmark by more than this
+# percentage (or exceeds its high end) get a full AI variance review; the
+# rest use local math only
+AI_REVIEW_VARIANCE_THRESHOLD = 50
+
+# Expected shape of AI responses; anything else is rejected as malformed
+CATEGORIZATION_FIELDS = {
+    "primary_category": str,
+    "subcategory": str,
+    "service_type": str,
+    "hidden_costs": list,
+    "msp_services": list,
+    "benchmark_category": str,
+    "complexity_level": str
+}
+
+BENCHMARK_VARIANCE_FIELDS = {
+    "benchmark_assessment": dict,
+    "variance_analysis": dict,
+    "hidden_cost_breakdown": dict,
+    "optimization_opportunities": dict,
+    "strategic_recommendations": dict
+}
+
+# Static prompt prefixes shared by every request; only the invoice fields
+# vary per request. The cache breakpoint sits on the last static block.
+# Note: at roughly 300 (categorization) and 460 (variance) tokens these
+# prefixes are below the minimum cacheable length (2048 tokens for Haiku,
+# 1024 for Opus), so the API currently ignores the marker and nothing is
+# cached. It takes effect without changes if the prompts grow past that.
+PROMPT_CACHE_CONTROL = {"type": "ephemeral", "ttl": "1h"}
+
+# Bump when the user prompt text or response handling changes; the persisted
+# response cache is discarded whenever its version tag no longer matches
+RESPONSE_CACHE_SCHEMA_VERSION = 2
+
+CATEGORIZATION_SYSTEM_PROMPT = [
+    {
+        "type": "text",
+        "text": """You are an expert licensing analyst specializing in detailed invoice categorization for benchmark analysis. 
+        Your role is to categorize invoices with high precision, especially identifying MSP hidden costs and service breakdowns.
+        Focus on identifying specific service types, hidden costs, and proper categorization for industry benchmarking.
+        Respond with JSON only containing: primary_category, subcategory, service_type, hidden_costs (array), 
+        msp_services (array), benchmark_category, and complexity_level."""
+    },
+    {
+        "type": "text",
+        "text": """Categorize the invoice in the user message for precise benchmark analysis, especially identifying MSP hidden costs.
+        
+        Respond with JSON only:
+        {
+            "primary_category": "it_services/development_tools/enterprise_software/cloud_services/security_software",
+            "subcategory": "specific_subcategory",
+            "service_type": "managed_services/consulting/support/license/subscription",
+            "hidden_costs": ["cost1", "cost2"],
+            "msp_services": ["service1", "service2"],
+            "benchmark_category": "exact_benchmark_category",
+            "complexity_level": "simple/moderate/complex"
+        }""",
+        "cache_control": PROMPT_CACHE_CONTROL
+    }
+]
+
+BENCHMARK_VARIANCE_SYSTEM_PROMPT = [
+    {
+        "type": "text",
+        "text": """You are an expert licensing analyst specializing in benchmark analysis and cost optimization. 
+        Your role is to analyze spending against industry benchmarks and provide detailed insights about variances,
+        especially for MSP services and hidden costs. Focus on identifying optimization opportunities and strategic recommendations.
+        Respond with JSON only containing: benchmark_assessment, variance_analysis, hidden_cost_breakdown, 
+        optimization_opportunities, and strategic_recommendations."""
+    },
+    {
+        "type": "text",
+        "text": """Analyze the invoice in the user message against industry benchmarks, especially focusing on MSP hidden costs.
+        
+        Respond with JSON only:
+        {
+            "benchmark_assessment": {
+                "is_above_benchmark": true/false,
+                "benchmark_percentage": "typical_industry_percentage",
+                "variance_reason": "explanation"
+            },
+            "variance_analysis": {
+                "primary_factors": ["factor1", "factor2"],
+                "msp_markup_analysis": "detailed_analysis",
+                "hidden_cost_impact": "impact_assessment"
+            },
+            "hidden_cost_breakdown": {
+                "identified_costs": ["cost1", "cost2"],
+                "estimated_markup": "percentage",
+                "transparency_level": "high/medium/low"
+            },
+            "optimization_opportunities": {
+                "immediate_savings": "dollar_amount",
+                "strategic_opportunities": ["opportunity1", "opportunity2"],
+                "risk_level": "low/medium/high"
+            },
+            "strategic_recommendations": {
+                "short_term": ["recommendation1", "recommendation2"],
+                "long_term": ["recommendation1", "recommendation2"],
+                "priority": "high/medium/low"
+            }
+        }""",
+        "cache_control": PROMPT_CACHE_CONTROL
+    }
+]
+
 class AIEnhancedBenchmarkAnalyzer:
-    def __init__(self, anthropic_api_key: str = None):
+    def __init__(self, anthropic_api_key: str = None, max_concurrent_requests: int = 10,
+                 categorization_batch_size: int = 16):
         self.data_file = "reports/current/cleaned_licensing_data_20250725.json"
         self.output_file = "reports/current/ai_enhanced_industry_analysis_20250725.md"
         self.json_output = "reports/current/ai_enhanced_industry_analysis_20250725.json"
+        self.response_cache_file = "reports/current/ai_enhanced_response_cache.json"
         
         # Initialize Anthropic client using the same approach as other scripts
         from config import get_api_key
         self.anthropic_api_key = anthropic_api_key or get_api_key()
         
-        self.anthropic_client = anthropic.Anthropic(api_key=self.anthropic_api_key)
+        self.async_client = anthropic.AsyncAnthropic(api_key=self.anthropic_api_key)
+        
+        # Number of API requests allowed in flight at once
+        self.max_concurrent_requests = max_concurrent_requests
+        # Number of invoices packed into a single categorization request
+        self.categorization_batch_size = categorization_batch_size
+        
+        # AI responses memoized by invoice fingerprint, persisted between runs
+        self.categorization_cache = {}
+        self.benchmark_variance_cache = {}
         
         # AI Model configurations
         self.model_configs = {
@@ -41,6 +169,7 @@ class AIEnhancedBenchmarkAnalyzer:
                 "temperature": 0.1
             }
         }
+        self.load_response_cache()
         
         # Enhanced industry benchmark data with AI-refined categories
         self.industry_benchmarks = {
@@ -76,33 +205,35 @@ class AIEnhancedBenchmarkAnalyzer:
             }
         }
         
-        # Vendor consolidation mappings
-        self.vendor_mappings = {
-            'synoptek': 'Synoptek',
-            'synoptek, llc': 'Synoptek',
-            'synoptek llc': 'Synoptek',
-            'atlassian': 'Atlassian',
-            'microsoft': 'Microsoft',
-            'oracle': 'Oracle',
-            'salesforce': 'Salesforce',
-            'aws': 'AWS',
-            'amazon': 'AWS',
-            'amazon web services': 'AWS',
-            'azure': 'Microsoft Azure',
-            'google': 'Google',
-            'gcp': 'Google Cloud',
-            'google cloud': 'Google Cloud',
-            'github': 'GitHub',
-            'gitlab': 'GitLab',
-            'crowdstrike': 'CrowdStrike',
-            'sentinelone': 'SentinelOne',
-            'palo alto': 'Palo Alto Networks',
-            'proofpoint': 'Proofpoint',
-            'harman': 'Harman',
-            'harman connected services': 'Harman',
-            'markov': 'Markov Processes',
-            'markov processes': 'Markov Processes',
-            'markov processes international': 'Markov Processes'
+        # (low, high, typical) share of spend per "primary.subcategory" key
+        self._benchmark_ratios = {
+            f"{category}.{subcategory}": (ranges["low"], ranges["high"], ranges["typical"])
+            for category, subcategories in self.industry_benchmarks.items()
+            for subcategory, ranges in subcategories.items()
+        }
+        self._benchmark_ratios["unknown"] = (0.10, 0.20, 0.15)
+        
+        # Raw vendor string -> consolidated name; vendor names repeat heavily
+        # across invoices so each distinct spelling is resolved only once
+        self._consolidated_vendor_cache = {}
+        
+        # Deterministic categories for vendors whose product line implies the
+        # benchmark category. MSPs are deliberately absent: their invoices need
+        # the AI pass to surface hidden costs and bundled services.
+        self.vendor_category_rules = {
+            'GitHub': ('development_tools', 'version_control'),
+            'GitLab': ('development_tools', 'version_control'),
+            'Atlassian': ('development_tools', 'project_management'),
+            'Microsoft': ('enterprise_software', 'productivity'),
+            'Oracle': ('enterprise_software', 'database'),
+            'Salesforce': ('enterprise_software', 'crm'),
+            'AWS': ('cloud_services', 'infrastructure'),
+            'Microsoft Azure': ('cloud_services', 'infrastructure'),
+            'Google Cloud': ('cloud_services', 'infrastructure'),
+            'CrowdStrike': ('security_software', 'endpoint_protection'),
+            'SentinelOne': ('security_software', 'endpoint_protection'),
+            'Palo Alto Networks': ('security_software', 'network_security'),
+            'Proofpoint': ('security_software', 'network_security')
         }
         
         # Company extraction patterns
@@ -114,34 +245,40 @@ class AIEnhancedBenchmarkAnalyzer:
             (r'great gray', 'Great Gray'),
             (r'great gray market', 'Great Gray Market')
         ]
+        # Single alternation over all company patterns, longest first so that
+        # e.g. "great gray market" wins over "great gray" at the same position
+        ordered_patterns = sorted(self.company_patterns, key=lambda p: len(p[0]), reverse=True)
+        self._company_re = re.compile(
+            "|".join(f"(?P<c{i}>{pattern})" for i, (pattern, _) in enumerate(ordered_patterns)),
+            re.IGNORECASE
+        )
+        self._company_names = {f"c{i}": company_name for i, (_, company_name) in enumerate(ordered_patterns)}
+        
+        # Date formats, compiled once rather than per record
+        self._date_patterns = [
+            re.compile(r'(\d{1,2})/(\d{1,2})/(\d{4})'),  # MM/DD/YYYY
+            re.compile(r'(\d{4})-(\d{1,2})-(\d{1,2})'),  # YYYY-MM-DD
+            re.compile(r'(\d{1,2})-(\d{1,2})-(\d{4})'),  # MM-DD-YYYY
+        ]
     
     def consolidate_vendor_name(self, vendor_name):
         """Consolidate vendor names to handle variations."""
-        vendor_lower = vendor_name.lower().strip()
-        
-        # Check for exact matches first
-        for key, value in self.vendor_mappings.items():
-            if vendor_lower == key:
-                return value
-        
-        # Check for partial matches
-        for key, value in self.vendor_mappings.items():
-            if key in vendor_lower:
-                return value
+        cached = self._consolidated_vendor_cache.get(vendor_name)
+        if cached is not None:
+            return cached
         
-        # Return original name if no match found
-        return vendor_name
+        consolidated = vendor_consolidation.consolidate_vendor_name(vendor_name)
+        self._consolidated_vendor_cache[vendor_name] = consolidated
+        return consolidated
     
     def extract_company_from_bill_to(self, bill_to):
         """Extract company name from bill_to field."""
         if not bill_to:
             return "Unknown Company"
         
-        bill_to_lower = bill_to.lower()
-        
-        for pattern, company_name in self.company_patterns:
-            if re.search(pattern, bill_to_lower):
-                return company_name
+        match = self._company_re.search(bill_to)
+        if match:
+            return self._company_names[match.lastgroup]
         
         return "Unknown Company"
     
@@ -151,14 +288,8 @@ class AIEnhancedBenchmarkAnalyzer:
             return None
         
         # Handle various date formats
-        date_patterns = [
-            r'(\d{1,2})/(\d{1,2})/(\d{4})',  # MM/DD/YYYY
-            r'(\d{4})-(\d{1,2})-(\d{1,2})',  # YYYY-MM-DD
-            r'(\d{1,2})-(\d{1,2})-(\d{4})',  # MM-DD-YYYY
-        ]
-        
-        for pattern in date_patterns:
-            match = re.search(pattern, date_str)
+        for pattern in self._date_patterns:
+            match = pattern.search(date_str)
             if match:
                 if len(match.group(1)) == 4:  # YYYY-MM-DD
                     return int(match.group(1))
@@ -167,20 +298,67 @@ class AIEnhancedBenchmarkAnalyzer:
         
         return None
     
-    def ai_categorize_invoice(self, invoice_data):
-        """Use AI to categorize invoice for better benchmark determination."""
-        
-        # Static system prompt that can be cached
-        system_prompt = {
-            "type": "text",
-            "text": """You are an expert licensing analyst specializing in detailed invoice categorization for benchmark analysis. 
-            Your role is to categorize invoices with high precision, especially identifying MSP hidden costs and service breakdowns.
-            Focus on identifying specific service types, hidden costs, and proper categorization for industry benchmarking.
-            Respond with JSON only containing: primary_category, subcategory, service_type, hidden_costs (array), 
-            msp_services (array), benchmark_category, and complexity_level.""",
-            "cache_control": {"type": "ephemeral"}
-        }
+    def invoice_fingerprint(self, invoice_data):
+        """Stable hash of the invoice fields that drive its categorization."""
+        line_items = invoice_data.get('line_items', [])
+        if isinstance(line_items, list):
+            descriptions = sorted(str(item.get('description', '')) for item in line_items)
+        else:
+            descriptions = [str(line_items)]
         
+        payload = json.dumps({
+            'v': self.consolidate_vendor_name(invoice_data.get('vendor') or 'Unknown'),
+            'items': descriptions,
+            'company': self.extract_company_from_bill_to(invoice_data.get('bill_to', ''))
+        }, sort_keys=True)
+        return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+    
+    def _benchmark_variance_key(self, invoice_data, ai_categorization, actual_spend, total_spend):
+        """Cache key for a benchmark variance response."""
+        # The prompt states the exact amount and its share of total spend, and
+        # the response quotes dollar figures from them, so the key has both
+        spend_share = f"{actual_spend / total_spend * 100:.2f}" if total_spend else "0.00"
+        return (f"{self.invoice_fingerprint(invoice_data)}:{actual_spend:.2f}:{spend_share}:"
+                f"{ai_categorization.get('benchmark_category', 'unknown')}")
+    
+    def response_cache_version(self):
+        """Version tag of the response cache: schema version plus a digest of the prompts and models."""
+        payload = orjson.dumps([
+            CATEGORIZATION_SYSTEM_PROMPT, BENCHMARK_VARIANCE_SYSTEM_PROMPT, self.model_configs
+        ])
+        return f"{RESPONSE_CACHE_SCHEMA_VERSION}:{hashlib.blake2b(payload, digest_size=8).hexdigest()}"
+    
+    def load_response_cache(self):
+        """Load memoized AI responses from the sidecar cache file."""
+        if not os.path.exists(self.response_cache_file):
+            return
+        
+        try:
+            with open(self.response_cache_file, 'rb') as f:
+                cache = orjson.loads(f.read())
+            if cache.get('version') != self.response_cache_version():
+                logger.info("Discarding AI response cache written for different prompts or models")
+                return
+            self.categorization_cache.update(cache.get('categorizations', {}))
+            self.benchmark_variance_cache.update(cache.get('benchmark_variance', {}))
+            logger.info(f"Loaded {len(self.categorization_cache)} cached categorizations")
+        except Exception as e:
+            logger.warning(f"Could not load AI response cache: {e}")
+    
+    def save_response_cache(self):
+        """Persist memoized AI responses so later runs can skip repeat calls."""
+        try:
+            with open(self.response_cache_file, 'wb') as f:
+                f.write(orjson.dumps({
+                    'version': self.response_cache_version(),
+                    'categorizations': self.categorization_cache,
+                    'benchmark_variance': self.benchmark_variance_cache
+                }))
+        except Exception as e:
+            logger.warning(f"Could not save AI response cache: {e}")
+    
+    def _invoice_prompt_text(self, invoice_data):
+        """Render the invoice fields sent to the categorization prompt."""
         # Prepare line items text
         line_items = invoice_data.get('line_items', [])
         if isinstance(line_items, list):
@@ -191,65 +369,122 @@ class AIEnhancedBenchmarkAnalyzer:
         else:
             line_items_text = str(line_items)
         
-        user_content = f"""
-        Categorize this invoice for precise benchmark analysis, especially identifying MSP hidden costs:
+        return f"""Vendor: {invoice_data.get('vendor', 'Unknown')}
+Total: ${invoice_data.get('total_amount', 0):,.2f}
+Bill To: {invoice_data.get('bill_to', 'Unknown')}
+Line Items:
+{line_items_text}"""
+    
+    def _categorization_request(self, invoice_data):
+        """Build the messages.create arguments for invoice categorization."""
+        return {
+            "model": self.model_configs["categorization"]["model"],
+            "max_tokens": self.model_configs["categorization"]["max_tokens"],
+            "temperature": self.model_configs["categorization"]["temperature"],
+            "system": CATEGORIZATION_SYSTEM_PROMPT,
+            "messages": [{"role": "user", "content": self._invoice_prompt_text(invoice_data)}]
+        }
+    
+    def _categorization_batch_request(self, invoices):
+        """Build the messages.create arguments for categorizing several invoices at once."""
+        user_content = "\n\n".join(
+            f"Invoice {i}:\n{self._invoice_prompt_text(invoice_data)}"
+            for i, invoice_data in enumerate(invoices, 1)
+        )
+        user_content += (f"\n\nRespond with a JSON array of {len(invoices)} objects, "
+                         f"one per invoice in the order given, each using the schema above.")
         
-        Vendor: {invoice_data.get('vendor', 'Unknown')}
-        Total: ${invoice_data.get('total_amount', 0):,.2f}
-        Bill To: {invoice_data.get('bill_to', 'Unknown')}
-        Line Items:
-        {line_items_text}
+        return {
+            "model": self.model_configs["categorization"]["model"],
+            "max_tokens": max(self.model_configs["categorization"]["max_tokens"], 200 * len(invoices)),
+            "temperature": self.model_configs["categorization"]["temperature"],
+            "system": CATEGORIZATION_SYSTEM_PROMPT,
+            "messages": [{"role": "user", "content": user_content}]
+        }
+    
+    def _validate_response(self, result, fields):
+        """Raise ValueError unless result is a JSON object with the expected field types."""
+        if not isinstance(result, dict):
+            raise ValueError("expected a JSON object")
+        for field, expected_type in fields.items():
+            if not isinstance(result.get(field), expected_type):
+                raise ValueError(f"field '{field}' is missing or not a {expected_type.__name__}")
+        return result
+    
+    async def _call_validated_async(self, request, parse, description):
+        """Call the API and parse the response, retrying once if it is malformed.
         
-        Respond with JSON only:
-        {{
-            "primary_category": "it_services/development_tools/enterprise_software/cloud_services/security_software",
-            "subcategory": "specific_subcategory",
-            "service_type": "managed_services/consulting/support/license/subscription",
-            "hidden_costs": ["cost1", "cost2"],
-            "msp_services": ["service1", "service2"],
-            "benchmark_category": "exact_benchmark_category",
-            "complexity_level": "simple/moderate/complex"
-        }}
+        Returns None when the request fails or the response stays invalid.
         """
+        for attempt in (1, 2):
+            try:
+                return parse(await self.async_client.messages.create(**request))
+            except anthropic.APIError as e:
+                logger.error(f"{description} failed: {e}")
+                return None
+            except ValueError as e:  # includes json.JSONDecodeError
+                logger.warning(f"{description} returned an invalid response (attempt {attempt}): {e}")
         
-        try:
-            response = self.anthropic_client.messages.create(
-                model=self.model_configs["categorization"]["model"],
-                max_tokens=self.model_configs["categorization"]["max_tokens"],
-                temperature=self.model_configs["categorization"]["temperature"],
-                system=[system_prompt],
-                messages=[{"role": "user", "content": user_content}]
-            )
-            
-            result = json.loads(response.content[0].text)
-            logger.info(f"AI categorization completed: {result.get('primary_category', 'Unknown')} - {result.get('subcategory', 'Unknown')}")
-            return result
-            
-        except Exception as e:
-            logger.error(f"AI categorization failed: {e}")
-            return {
-                "primary_category": "it_services",
-                "subcategory": "managed_services",
-                "service_type": "service",
-                "hidden_costs": [],
-                "msp_services": [],
-                "benchmark_category": "it_services.managed_services",
-                "complexity_level": "moderate"
-            }
+        logger.error(f"{description} failed: invalid response after retry")
+        return None
+    
+    def _response_json(self, response):
+        """Decode the JSON body of a messages.create response."""
+        text = response.content[0].text if response.content else ""
+        return json.loads(text)
     
-    def ai_analyze_benchmark_variance(self, invoice_data, ai_categorization, actual_spend, total_spend):
-        """Use AI to analyze benchmark variance and provide detailed insights."""
-        
-        # Static system prompt that can be cached
-        system_prompt = {
-            "type": "text",
-            "text": """You are an expert licensing analyst specializing in benchmark analysis and cost optimization. 
-            Your role is to analyze spending against industry benchmarks and provide detailed insights about variances,
-            especially for MSP services and hidden costs. Focus on identifying optimization opportunities and strategic recommendations.
-            Respond with JSON only containing: benchmark_assessment, variance_analysis, hidden_cost_breakdown, 
-            optimization_opportunities, and strategic_recommendations.""",
-            "cache_control": {"type": "ephemeral"}
+    def _parse_categorization(self, response):
+        """Parse and validate a categorization response."""
+        result = self._validate_response(self._response_json(response), CATEGORIZATION_FIELDS)
+        logger.info(f"AI categorization completed: {result['primary_category']} - {result['subcategory']}")
+        return result
+    
+    def rule_based_categorization(self, invoice_data):
+        """Categorize from the vendor alone when a rule exists; returns None otherwise."""
+        vendor = self.consolidate_vendor_name(invoice_data.get('vendor') or 'Unknown')
+        rule = self.vendor_category_rules.get(vendor)
+        if rule is None:
+            return None
+        
+        primary_category, subcategory = rule
+        return {
+            "primary_category": primary_category,
+            "subcategory": subcategory,
+            "service_type": "subscription",
+            "hidden_costs": [],
+            "msp_services": [],
+            "benchmark_category": f"{primary_category}.{subcategory}",
+            "complexity_level": "simple"
         }
+    
+    def _parse_categorization_batch(self, response, count):
+        """Parse and validate a batch categorization response into one result per invoice."""
+        results = self._response_json(response)
+        if isinstance(results, dict) and count == 1:
+            results = [results]
+        if not isinstance(results, list) or len(results) != count:
+            raise ValueError(f"expected a JSON array of {count} categorizations")
+        for result in results:
+            self._validate_response(result, CATEGORIZATION_FIELDS)
+        logger.info(f"AI batch categorization completed for {count} invoices")
+        return results
+    
+    async def _ai_categorize_batch_async(self, invoices):
+        """Categorize several invoices with a single AI request, in order; None entries on failure."""
+        results = await self._call_validated_async(
+            self._categorization_batch_request(invoices),
+            lambda response: self._parse_categorization_batch(response, len(invoices)),
+            "AI batch categorization"
+        )
+        if results is None:
+            return [None] * len(invoices)
+        
+        for invoice_data, result in zip(invoices, results):
+            self.categorization_cache[self.invoice_fingerprint(invoice_data)] = result
+        return results
+    
+    def _benchmark_variance_request(self, invoice_data, ai_categorization, actual_spend, total_spend):
+        """Build the messages.create arguments for benchmark variance analysis."""
         
         # Prepare line items text
         line_items = invoice_data.get('line_items', [])
@@ -261,128 +496,297 @@ class AIEnhancedBenchmarkAnalyzer:
         else:
             line_items_text = str(line_items)
         
-        user_content = f"""
-        Analyze this invoice against industry benchmarks, especially focusing on MSP hidden costs:
+        user_content = f"""Vendor: {invoice_data.get('vendor', 'Unknown')}
+Total: ${invoice_data.get('total_amount', 0):,.2f}
+Percentage of Total Spend: {(actual_spend/total_spend*100):.2f}%
+AI Categorization: {ai_categorization.get('primary_category', 'Unknown')} - {ai_categorization.get('subcategory', 'Unknown')}
+Service Type: {ai_categorization.get('service_type', 'Unknown')}
+Hidden Costs: {ai_categorization.get('hidden_costs', [])}
+MSP Services: {ai_categorization.get('msp_services', [])}
+Line Items:
+{line_items_text}"""
+        
+        return {
+            "model": self.model_configs["benchmark_analysis"]["model"],
+            "max_tokens": self.model_configs["benchmark_analysis"]["max_tokens"],
+            "temperature": self.model_configs["benchmark_analysis"]["temperature"],
+            "system": BENCHMARK_VARIANCE_SYSTEM_PROMPT,
+            "messages": [{"role": "user", "content": user_content}]
+        }
+    
+    def _parse_benchmark_variance(self, response, invoice_data):
+        """Parse and validate a benchmark variance response."""
+        result = self._validate_response(self._response_json(response), BENCHMARK_VARIANCE_FIELDS)
+        logger.info(f"AI benchmark analysis completed for {invoice_data.get('vendor', 'Unknown')}")
+        return result
+    
+    async def _ai_analyze_benchmark_variance_async(self, invoice_data, ai_categorization, actual_spend, total_spend):
+        """Use AI to analyze benchmark variance and provide detailed insights; None on failure."""
+        cache_key = self._benchmark_variance_key(invoice_data, ai_categorization, actual_spend, total_spend)
+        if cache_key in self.benchmark_variance_cache:
+            return self.benchmark_variance_cache[cache_key]
+        
+        result = await self._call_validated_async(
+            self._benchmark_variance_request(invoice_data, ai_categorization, actual_spend, total_spend),
+            lambda response: self._parse_benchmark_variance(response, invoice_data),
+            "AI benchmark analysis"
+        )
+        if result is not None:
+            self.benchmark_variance_cache[cache_key] = result
+        return result
+    
+    def iter_records(self):
+        """Stream invoice records from the data file without loading it whole."""
+        with open(self.data_file, 'rb') as f:
+            yield from ijson.items(f, 'item', use_float=True)
+    
+    def compute_variance_locally(self, amount, benchmark, ai_categorization, total_spend):
+        """Build the benchmark variance analysis from the benchmark math alone."""
+        category = benchmark["category"]
+        variance_percentage = 0
+        if benchmark["typical"] > 0:
+            variance_percentage = ((amount - benchmark["typical"]) / benchmark["typical"]) * 100
         
-        Vendor: {invoice_data.get('vendor', 'Unknown')}
-        Total: ${invoice_data.get('total_amount', 0):,.2f}
-        Percentage of Total Spend: {(actual_spend/total_spend*100):.2f}%
-        AI Categorization: {ai_categorization.get('primary_category', 'Unknown')} - {ai_categorization.get('subcategory', 'Unknown')}
-        Service Type: {ai_categorization.get('service_type', 'Unknown')}
-        Hidden Costs: {ai_categorization.get('hidden_costs', [])}
-        MSP Services: {ai_categorization.get('msp_services', [])}
-        Line Items:
-        {line_items_text}
+        is_above_benchmark = amount > benchmark["high"]
+        if variance_percentage > AI_REVIEW_VARIANCE_THRESHOLD:
+            risk_level = "high"
+        elif is_above_benchmark:
+            risk_level = "medium"
+        else:
+            risk_level = "low"
         
-        Respond with JSON only:
-        {{
-            "benchmark_assessment": {{
-                "is_above_benchmark": true/false,
-                "benchmark_percentage": "typical_industry_percentage",
-                "variance_reason": "explanation"
-            }},
-            "variance_analysis": {{
-                "primary_factors": ["factor1", "factor2"],
-                "msp_markup_analysis": "detailed_analysis",
-                "hidden_cost_impact": "impact_assessment"
-            }},
-            "hidden_cost_breakdown": {{
-                "identified_costs": ["cost1", "cost2"],
-                "estimated_markup": "percentage",
-                "transparency_level": "high/medium/low"
-            }},
-            "optimization_opportunities": {{
-                "immediate_savings": "dollar_amount",
-                "strategic_opportunities": ["opportunity1", "opportunity2"],
-                "risk_level": "low/medium/high"
-            }},
-            "strategic_recommendations": {{
-                "short_term": ["recommendation1", "recommendation2"],
-                "long_term": ["recommendation1", "recommendation2"],
-                "priority": "high/medium/low"
-            }}
-        }}
+        hidden_costs = ai_categorization.get('hidden_costs', [])
+        msp_services = ai_categorization.get('msp_services', [])
+        
+        return {
+            "benchmark_assessment": {
+                "is_above_benchmark": is_above_benchmark,
+                "benchmark_percentage": f"{benchmark['typical'] / total_spend * 100:.2f}%" if total_spend > 0 else "unknown",
+                "variance_reason": f"Spend is {variance_percentage:+.1f}% versus the typical {category} benchmark"
+            },
+            "variance_analysis": {
+                "primary_factors": [f"{variance_percentage:+.1f}% variance from typical {category} spend"],
+                "msp_markup_analysis": f"MSP services: {', '.join(msp_services)}" if msp_services else "No MSP services identified",
+                "hidden_cost_impact": f"{len(hidden_costs)} hidden cost item(s) identified" if hidden_costs else "No hidden costs identified"
+            },
+            "hidden_cost_breakdown": {
+                "identified_costs": hidden_costs,
+                "estimated_markup": "unknown",
+                "transparency_level": "medium" if hidden_costs else "high"
+            },
+            "optimization_opportunities": {
+                "immediate_savings": f"${max(amount - benchmark['high'], 0):,.2f}",
+                "strategic_opportunities": ["Renegotiate toward the benchmark range"] if is_above_benchmark else [],
+                "risk_level": risk_level
+            },
+            "strategic_recommendations": {
+                "short_term": ["Review spend against the benchmark range"] if is_above_benchmark else [],
+                "long_term": ["Track spend against industry benchmarks"],
+                "priority": risk_level
+            }
+        }
+    
+    def needs_ai_variance_review(self, invoice_data, amount, benchmark):
+        """Whether a record is unusual enough to warrant the AI variance analysis."""
+        if self.consolidate_vendor_name(invoice_data.get('vendor') or 'Unknown') in MSP_VENDORS:
+            return True
+        if amount > benchmark["high"]:
+            return True
+        if benchmark["typical"] <= 0:
+            return False
+        # Only overspend is worth a review; spend below the benchmark is the
+        # normal case for single invoices measured against the running total
+        variance_percentage = ((amount - benchmark["typical"]) / benchmark["typical"]) * 100
+        return variance_percentage > AI_REVIEW_VARIANCE_THRESHOLD
+    
+    def merge_variance_analysis(self, local_analysis, ai_analysis):
+        """Overlay AI variance analysis sections on top of the locally computed ones."""
+        merged = dict(local_analysis)
+        for section, values in ai_analysis.items():
+            if isinstance(values, dict) and isinstance(merged.get(section), dict):
+                merged[section] = {**merged[section], **values}
+            else:
+                merged[section] = values
+        return merged
+    
+    def _slim_record(self, item, running_total):
+        """Keep only the invoice fields the aggregation reads."""
+        record = {key: item.get(key) for key in ('vendor', 'total_amount', 'invoice_date', 'bill_to') if key in item}
+        record['running_total'] = running_total
+        return record
+    
+    async def _run_ai_calls_async(self, records):
+        """Categorize and benchmark invoices concurrently as they are parsed.
+        
+        Invoices that need the AI are categorized in batches. Returns
+        (record, categorization, benchmark_analysis) tuples in input order,
+        where record keeps only the fields the aggregation needs plus the
+        running spend total it was analyzed against. Categorization and
+        benchmark analysis are None for records whose categorization failed.
         """
+        api_slots = asyncio.Semaphore(self.max_concurrent_requests)
+        # Bounds how many parsed records are held at once
+        record_window = asyncio.Semaphore(self.max_concurrent_requests * self.categorization_batch_size)
+        loop = asyncio.get_running_loop()
+        # Duplicate invoices in flight at the same time share one request;
+        # settled entries are dropped, later repeats read the response caches
+        pending = {}
+        batch = []
+        batch_tasks = []
         
-        try:
-            response = self.anthropic_client.messages.create(
-                model=self.model_configs["benchmark_analysis"]["model"],
-                max_tokens=self.model_configs["benchmark_analysis"]["max_tokens"],
-                temperature=self.model_configs["benchmark_analysis"]["temperature"],
-                system=[system_prompt],
-                messages=[{"role": "user", "content": user_content}]
-            )
-            
-            result = json.loads(response.content[0].text)
-            logger.info(f"AI benchmark analysis completed for {invoice_data.get('vendor', 'Unknown')}")
-            return result
+        async def limited(coro):
+            async with api_slots:
+                return await coro
+        
+        def track(key, future):
+            def forget(_):
+                if pending.get(key) is future:
+                    del pending[key]
+            pending[key] = future
+            future.add_done_callback(forget)
+            return future
+        
+        def shared(key, make_call):
+            if key not in pending:
+                track(key, asyncio.ensure_future(limited(make_call())))
+            return pending[key]
+        
+        async def categorize_batch(items, futures):
+            try:
+                results = await limited(self._ai_categorize_batch_async(items))
+            except Exception as e:
+                # Fail the waiting records too, or gather would never return
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+                raise
+            for future, result in zip(futures, results):
+                future.set_result(result)
+        
+        def flush_batch():
+            if batch:
+                items, futures = zip(*batch)
+                batch.clear()
+                batch_tasks.append(asyncio.ensure_future(categorize_batch(list(items), list(futures))))
+        
+        def categorization_for(item):
+            future = loop.create_future()
+            categorization = self.rule_based_categorization(item)
+            if categorization is not None:
+                future.set_result(categorization)
+                return future
             
-        except Exception as e:
-            logger.error(f"AI benchmark analysis failed: {e}")
-            return {
-                "benchmark_assessment": {
-                    "is_above_benchmark": False,
-                    "benchmark_percentage": "unknown",
-                    "variance_reason": "Analysis failed"
-                },
-                "variance_analysis": {
-                    "primary_factors": ["Unknown"],
-                    "msp_markup_analysis": "Unable to analyze",
-                    "hidden_cost_impact": "Unable to assess"
-                },
-                "hidden_cost_breakdown": {
-                    "identified_costs": [],
-                    "estimated_markup": "unknown",
-                    "transparency_level": "unknown"
-                },
-                "optimization_opportunities": {
-                    "immediate_savings": "$0",
-                    "strategic_opportunities": ["Unable to determine"],
-                    "risk_level": "unknown"
-                },
-                "strategic_recommendations": {
-                    "short_term": ["Unable to determine"],
-                    "long_term": ["Unable to determine"],
-                    "priority": "unknown"
-                }
-            }
+            fingerprint = self.invoice_fingerprint(item)
+            if fingerprint in self.categorization_cache:
+                future.set_result(self.categorization_cache[fingerprint])
+            elif fingerprint in pending:
+                future = pending[fingerprint]
+            else:
+                track(fingerprint, future)
+                batch.append((item, future))
+                if len(batch) >= self.categorization_batch_size:
+                    flush_batch()
+            return future
+        
+        async def process(item, running_total, categorization):
+            amount = item.get('total_amount', 0)
+            ai_benchmark_analysis = None
+            try:
+                ai_categorization = await categorization
+                if ai_categorization is None:
+                    return self._slim_record(item, running_total), None, None
+                benchmark = self.get_ai_enhanced_benchmark(ai_categorization, running_total)
+                ai_benchmark_analysis = self.compute_variance_locally(amount, benchmark, ai_categorization, running_total)
+                
+                # Only unusual records are worth the expensive AI variance review
+                if self.needs_ai_variance_review(item, amount, benchmark):
+                    ai_review = await shared(
+                        self._benchmark_variance_key(item, ai_categorization, amount, running_total),
+                        lambda: self._ai_analyze_benchmark_variance_async(
+                            item, ai_categorization, amount, running_total
+                        )
+                    )
+                    if ai_review is not None:
+                        ai_benchmark_analysis = self.merge_variance_analysis(ai_benchmark_analysis, ai_review)
+            finally:
+                record_window.release()
+            return self._slim_record(item, running_total), ai_categorization, ai_benchmark_analysis
+        
+        tasks = []
+        # Each invoice is analyzed against the spend seen up to and including itself
+        running_total = 0
+        for item in records:
+            # A full window may be waiting on a partial batch, so send it first
+            if record_window.locked():
+                flush_batch()
+            # Only parse the next record once the window has room
+            await record_window.acquire()
+            running_total += item.get('total_amount', 0)
+            tasks.append(asyncio.ensure_future(process(item, running_total, categorization_for(item))))
+        flush_batch()
+        
+        # Batch tasks are gathered too so a failed batch's error is consumed there
+        results = await asyncio.gather(*tasks, *batch_tasks)
+        return results[:len(tasks)]
     
-    def get_ai_enhanced_benchmark(self, ai_categorization, total_spend):
-        """Get AI-enhanced benchmark based on detailed categorization."""
+    def get_benchmark_category(self, ai_categorization):
+        """Resolve the benchmark category key ("primary.subcategory") for a categorization."""
         primary_category = ai_categorization.get('primary_category', 'it_services')
         subcategory = ai_categorization.get('subcategory', 'managed_services')
         
         # Get benchmark from detailed structure
         if primary_category in self.industry_benchmarks:
             if subcategory in self.industry_benchmarks[primary_category]:
-                benchmark = self.industry_benchmarks[primary_category][subcategory]
-                return {
-                    "low": total_spend * benchmark["low"],
-                    "high": total_spend * benchmark["high"],
-                    "typical": total_spend * benchmark["typical"],
-                    "category": f"{primary_category}.{subcategory}"
-                }
-        
-        # Fallback to primary category
-        if primary_category in self.industry_benchmarks:
-            # Use first subcategory as default
-            first_subcategory = list(self.industry_benchmarks[primary_category].keys())[0]
-            benchmark = self.industry_benchmarks[primary_category][first_subcategory]
-            return {
-                "low": total_spend * benchmark["low"],
-                "high": total_spend * benchmark["high"],
-                "typical": total_spend * benchmark["typical"],
-                "category": f"{primary_category}.{first_subcategory}"
-            }
+                return f"{primary_category}.{subcategory}"
+            
+            # Fallback to primary category, using first subcategory as default
+            first_subcategory = next(iter(self.industry_benchmarks[primary_category]))
+            return f"{primary_category}.{first_subcategory}"
         
         # Default benchmark
+        return "unknown"
+    
+    def get_ai_enhanced_benchmark(self, ai_categorization, total_spend):
+        """Get AI-enhanced benchmark based on detailed categorization."""
+        category = self.get_benchmark_category(ai_categorization)
+        low, high, typical = self._benchmark_ratios[category]
         return {
-            "low": total_spend * 0.10,
-            "high": total_spend * 0.20,
-            "typical": total_spend * 0.15,
-            "category": "unknown"
+            "low": total_spend * low,
+            "high": total_spend * high,
+            "typical": total_spend * typical,
+            "category": category
         }
     
+    def apply_benchmarks(self, benchmark_records, benchmark_categories, spend_basis):
+        """Fill benchmark ranges, variance and status for all records at once.
+        
+        Each record is benchmarked against its entry in spend_basis, the
+        running spend total the AI analysis saw for it.
+        """
+        if not benchmark_records:
+            return
+        
+        amounts = np.array([record["actual_spend"] for record in benchmark_records], dtype=float)
+        ratios = np.array([self._benchmark_ratios[category] for category in benchmark_categories], dtype=float)
+        low, high, typical = (ratios * np.array(spend_basis, dtype=float)[:, None]).T
+        
+        variance = np.divide(amounts - typical, typical, out=np.zeros_like(amounts), where=typical > 0) * 100
+        status = np.where(amounts < low, "Below Benchmark",
+                          np.where(amounts > high, "Above Benchmark", "Within Benchmark"))
+        
+        for record, category, row_low, row_high, row_typical, row_variance, row_status in zip(
+            benchmark_records, benchmark_categories,
+            low.tolist(), high.tolist(), typical.tolist(), variance.tolist(), status.tolist()
+        ):
+            record["benchmark"] = {
+                "low": row_low,
+                "high": row_high,
+                "typical": row_typical,
+                "category": category
+            }
+            record["variance_percentage"] = row_variance
+            record["status"] = row_status
+    
     def analyze_with_ai_enhancement(self):
         """Perform AI-enhanced analysis with intelligent categorization."""
         print("=" * 60)
@@ -395,55 +799,59 @@ class AIEnhancedBenchmarkAnalyzer:
             print(f"Error: Data file {self.data_file} not found")
             return
         
-        with open(self.data_file, 'r') as f:
-            data = json.load(f)
-        
-        print(f"Loaded {len(data)} records for AI-enhanced analysis")
+        print(f"Streaming records from {self.data_file} for AI-enhanced analysis")
         print()
         
         # Initialize analysis structure
         analysis = {
             "summary": {
-                "total_records": len(data),
+                "total_records": 0,
                 "total_spend": 0,
                 "analysis_date": datetime.now().isoformat(),
                 "ai_enhanced": True
             },
-            "by_category": defaultdict(lambda: {
-                "total": 0,
-                "vendors": defaultdict(float),
-                "companies": defaultdict(float),
-                "yearly": defaultdict(float),
-                "ai_categorizations": [],
-                "benchmark_analysis": []
-            }),
-            "by_vendor": defaultdict(lambda: {
-                "total": 0,
-                "categories": defaultdict(float),
-                "companies": defaultdict(float),
-                "yearly": defaultdict(float),
-                "ai_analysis": []
-            }),
-            "by_company": defaultdict(lambda: {
-                "total": 0,
-                "categories": defaultdict(float),
-                "vendors": defaultdict(float),
-                "yearly": defaultdict(float)
-            }),
+            "by_category": {},
+            "by_vendor": {},
+            "by_company": {},
             "benchmarks": [],
-            "recommendations": []
+            "recommendations": [],
+            "errors": []
         }
         
         total_spend = 0
         
+        # Spend rows are aggregated with pandas once all records are in; raw
+        # AI results live only in analysis["benchmarks"], referenced by index
+        spend_rows = []
+        vendor_benchmark_indices = {}
+        benchmark_categories = []
+        spend_basis = []
+        
+        # Dispatch all AI calls concurrently, then reduce results in order
+        print(f"Running AI analysis with up to {self.max_concurrent_requests} concurrent requests, "
+              f"{self.categorization_batch_size} invoices per categorization batch...")
+        ai_results = asyncio.run(self._run_ai_calls_async(self.iter_records()))
+        self.save_response_cache()
+        analysis["summary"]["total_records"] = len(ai_results)
+        
         # Process each record with AI enhancement
-        for i, item in enumerate(data):
+        for i, (item, ai_categorization, ai_benchmark_analysis) in enumerate(ai_results):
             vendor = item.get('vendor', 'Unknown')
             amount = item.get('total_amount', 0)
             date_str = item.get('invoice_date', '')
             bill_to = item.get('bill_to', '')
             
-            print(f"Processing record {i+1}/{len(data)}: {vendor} - ${amount:,.2f}")
+            print(f"Processing record {i+1}/{len(ai_results)}: {vendor} - ${amount:,.2f}")
+            
+            # Records the AI could not categorize are reported, not guessed at
+            if ai_categorization is None:
+                analysis["errors"].append({
+                    "vendor": vendor,
+                    "invoice_date": date_str,
+                    "total_amount": amount,
+                    "error": "AI categorization failed"
+                })
+                continue
             
             # Apply intelligent consolidation
             consolidated_vendor = self.consolidate_vendor_name(vendor)
@@ -451,76 +859,58 @@ class AIEnhancedBenchmarkAnalyzer:
             year = self.parse_date(date_str) or 2025
             
             total_spend += amount
+            benchmark_categories.append(self.get_benchmark_category(ai_categorization))
+            spend_basis.append(item['running_total'])
             
-            # AI categorization
-            ai_categorization = self.ai_categorize_invoice(item)
-            
-            # AI benchmark analysis
-            ai_benchmark_analysis = self.ai_analyze_benchmark_variance(
-                item, ai_categorization, amount, total_spend
-            )
-            
-            # Get AI-enhanced benchmark
-            benchmark = self.get_ai_enhanced_benchmark(ai_categorization, total_spend)
-            
-            # Calculate variance
-            variance_percentage = 0
-            if benchmark["typical"] > 0:
-                variance_percentage = ((amount - benchmark["typical"]) / benchmark["typical"]) * 100
-            
-            # Determine status
-            if amount < benchmark["low"]:
-                status = "Below Benchmark"
-            elif amount > benchmark["high"]:
-                status = "Above Benchmark"
-            else:
-                status = "Within Benchmark"
-            
-            # Store benchmark data
+            # Store benchmark data; benchmark figures are filled in after the loop
             benchmark_record = {
                 "vendor": consolidated_vendor,
                 "company": company,
                 "category": ai_categorization.get('primary_category', 'Unknown'),
                 "subcategory": ai_categorization.get('subcategory', 'Unknown'),
                 "actual_spend": amount,
-                "benchmark": benchmark,
-                "variance_percentage": variance_percentage,
-                "status": status,
-                "percentage_of_total": (amount / total_spend * 100) if total_spend > 0 else 0,
+                "benchmark": None,
+                "variance_percentage": 0,
+                "status": None,
+                "percentage_of_total": 0,
                 "ai_categorization": ai_categorization,
                 "ai_benchmark_analysis": ai_benchmark_analysis
             }
             
             analysis["benchmarks"].append(benchmark_record)
             
-            # Update category analysis
+            # Collect spend row and index the benchmark record by vendor
             category = ai_categorization.get('primary_category', 'it_services')
-            analysis["by_category"][category]["total"] += amount
-            analysis["by_category"][category]["vendors"][consolidated_vendor] += amount
-            analysis["by_category"][category]["companies"][company] += amount
-            analysis["by_category"][category]["yearly"][year] += amount
-            analysis["by_category"][category]["ai_categorizations"].append(ai_categorization)
-            analysis["by_category"][category]["benchmark_analysis"].append(ai_benchmark_analysis)
-            
-            # Update vendor analysis
-            analysis["by_vendor"][consolidated_vendor]["total"] += amount
-            analysis["by_vendor"][consolidated_vendor]["categories"][category] += amount
-            analysis["by_vendor"][consolidated_vendor]["companies"][company] += amount
-            analysis["by_vendor"][consolidated_vendor]["yearly"][year] += amount
-            analysis["by_vendor"][consolidated_vendor]["ai_analysis"].append({
-                "categorization": ai_categorization,
-                "benchmark_analysis": ai_benchmark_analysis
-            })
-            
-            # Update company analysis
-            analysis["by_company"][company]["total"] += amount
-            analysis["by_company"][company]["categories"][category] += amount
-            analysis["by_company"][company]["vendors"][consolidated_vendor] += amount
-            analysis["by_company"][company]["yearly"][year] += amount
+            spend_rows.append((category, consolidated_vendor, company, year, amount))
+            vendor_benchmark_indices.setdefault(consolidated_vendor, []).append(len(analysis["benchmarks"]) - 1)
+        
+        self.apply_benchmarks(analysis["benchmarks"], benchmark_categories, spend_basis)
+        
+        # Aggregate spend by category, vendor and company in one vectorized pass
+        spend = pd.DataFrame(spend_rows, columns=["category", "vendor", "company", "year", "amount"])
+        analysis["by_category"] = self.aggregate_spend(
+            spend, "category", {"vendors": "vendor", "companies": "company", "yearly": "year"}
+        )
+        
+        analysis["by_vendor"] = self.aggregate_spend(
+            spend, "vendor", {"categories": "category", "companies": "company", "yearly": "year"}
+        )
+        for vendor, indices in vendor_benchmark_indices.items():
+            analysis["by_vendor"][vendor]["benchmark_indices"] = indices
+        
+        analysis["by_company"] = self.aggregate_spend(
+            spend, "company", {"categories": "category", "vendors": "vendor", "yearly": "year"}
+        )
         
         # Update summary
         analysis["summary"]["total_spend"] = total_spend
         
+        # Share of total spend, against the final total rather than the running one
+        if total_spend > 0:
+            amounts = np.array([b["actual_spend"] for b in analysis["benchmarks"]], dtype=float)
+            for benchmark_record, percentage in zip(analysis["benchmarks"], (amounts / total_spend * 100).tolist()):
+                benchmark_record["percentage_of_total"] = percentage
+        
         # Generate AI-enhanced recommendations
         analysis["recommendations"] = self.generate_ai_enhanced_recommendations(analysis)
         
@@ -530,12 +920,29 @@ class AIEnhancedBenchmarkAnalyzer:
         print()
         print("AI-Enhanced Analysis Complete!")
         print(f"Total Spend: ${total_spend:,.2f}")
-        print(f"Records Processed: {len(data)}")
+        print(f"Records Processed: {len(ai_results)}")
         print(f"AI Categorizations: {len(analysis['benchmarks'])}")
         print(f"Recommendations Generated: {len(analysis['recommendations'])}")
+        if analysis["errors"]:
+            print(f"Records Skipped (AI errors): {len(analysis['errors'])}")
         
         return analysis
     
+    def aggregate_spend(self, spend, key, breakdowns):
+        """Sum spend per key, with nested totals per breakdown column, in first-seen order."""
+        totals = spend.groupby(key, sort=False)["amount"].sum()
+        result = {
+            name: {"total": total, **{field: {} for field in breakdowns}}
+            for name, total in zip(totals.index.tolist(), totals.tolist())
+        }
+        
+        for field, column in breakdowns.items():
+            sums = spend.groupby([key, column], sort=False)["amount"].sum()
+            for (name, value_key), amount in zip(sums.index.tolist(), sums.tolist()):
+                result[name][field][value_key] = amount
+        
+        return result
+    
     def generate_ai_enhanced_recommendations(self, analysis):
         """Generate AI-enhanced recommendations based on detailed analysis."""
         recommendations = []
@@ -559,16 +966,14 @@ class AIEnhancedBenchmarkAnalyzer:
                 recommendations.append(recommendation)
         
         # Add MSP-specific recommendations
-        msp_vendors = ["Synoptek", "Harman", "Markov Processes"]
-        for vendor in msp_vendors:
+        for vendor in MSP_VENDORS:
             if vendor in analysis["by_vendor"]:
                 vendor_data = analysis["by_vendor"][vendor]
                 if vendor_data["total"] > 0:
                     # Analyze MSP hidden costs
-                    msp_analysis = vendor_data.get("ai_analysis", [])
                     hidden_costs = []
-                    for analysis_item in msp_analysis:
-                        categorization = analysis_item.get("categorization", {})
+                    for index in vendor_data.get("benchmark_indices", []):
+                        categorization = analysis["benchmarks"][index].get("ai_categorization", {})
                         hidden_costs.extend(categorization.get("hidden_costs", []))
                     
                     if hidden_costs:
@@ -593,8 +998,12 @@ class AIEnhancedBenchmarkAnalyzer:
     def save_ai_enhanced_results(self, analysis):
         """Save AI-enhanced analysis results."""
         # Save JSON
-        with open(self.json_output, 'w') as f:
-            json.dump(analysis, f, indent=2, default=str)
+        with open(self.json_output, 'wb') as f:
+            f.write(orjson.dumps(
+                analysis,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+                default=str
+            ))
         
         # Generate markdown report
         self.generate_ai_enhanced_report(analysis)
@@ -605,47 +1014,60 @@ class AIEnhancedBenchmarkAnalyzer:
     
     def generate_ai_enhanced_report(self, analysis):
         """Generate AI-enhanced markdown report."""
+        summary = analysis['summary']
+        parts = [
+            "# AI-Enhanced Industry Benchmark Analysis\n\n",
+            f"**Analysis Date:** {summary['analysis_date']}\n",
+            f"**Total Records:** {summary['total_records']:,}\n",
+            f"**Total Spend:** ${summary['total_spend']:,.2f}\n",
+            f"**AI Enhanced:** {summary['ai_enhanced']}\n\n"
+        ]
+        
+        # Summary statistics
+        parts.append("## Summary Statistics\n\n")
+        parts.append("### By Category\n")
+        parts.extend(
+            f"- **{category.title()}:** ${data['total']:,.2f}\n"
+            for category, data in analysis["by_category"].items()
+        )
+        parts.append("\n")
+        
+        # Benchmark analysis
+        parts.append("## AI-Enhanced Benchmark Analysis\n\n")
+        parts.append("### Above Benchmark Items\n")
+        parts.extend(
+            f"- **{benchmark['vendor']}** ({benchmark['category']}): ${benchmark['actual_spend']:,.2f} ({benchmark['variance_percentage']:+.1f}%)\n"
+            for benchmark in analysis["benchmarks"] if benchmark["status"] == "Above Benchmark"
+        )
+        parts.append("\n")
+        
+        # AI insights
+        parts.append("## AI-Generated Insights\n\n")
+        for benchmark in analysis["benchmarks"][:10]:  # Top 10
+            ai_analysis = benchmark.get("ai_benchmark_analysis", {})
+            if ai_analysis:
+                parts.append(
+                    f"### {benchmark['vendor']} - {benchmark['category']}\n"
+                    f"- **Variance Reason:** {ai_analysis.get('benchmark_assessment', {}).get('variance_reason', 'N/A')}\n"
+                    f"- **Hidden Costs:** {', '.join(ai_analysis.get('hidden_cost_breakdown', {}).get('identified_costs', []))}\n"
+                    f"- **Optimization:** {ai_analysis.get('optimization_opportunities', {}).get('immediate_savings', 'N/A')}\n\n"
+                )
+        
+        # Recommendations
+        parts.append("## AI-Enhanced Recommendations\n\n")
+        parts.extend(
+            f"### {rec['type'].title()} - {rec['vendor']}\n"
+            f"- **Priority:** {rec['priority'].title()}\n"
+            f"- **Message:** {rec['message']}\n"
+            f"- **Potential Savings:** {rec['potential_savings']}\n"
+            f"- **Short-term:** {', '.join(rec['ai_insights'].get('short_term', []))}\n"
+            f"- **Long-term:** {', '.join(rec['ai_insights'].get('long_term', []))}\n\n"
+            for rec in analysis["recommendations"]
+        )
+        
+        # Single write of the assembled report
         with open(self.output_file, 'w', encoding='utf-8') as f:
-            f.write("# AI-Enhanced Industry Benchmark Analysis\n\n")
-            f.write(f"**Analysis Date:** {analysis['summary']['analysis_date']}\n")
-            f.write(f"**Total Records:** {analysis['summary']['total_records']:,}\n")
-            f.write(f"**Total Spend:** ${analysis['summary']['total_spend']:,.2f}\n")
-            f.write(f"**AI Enhanced:** {analysis['summary']['ai_enhanced']}\n\n")
-            
-            # Summary statistics
-            f.write("## Summary Statistics\n\n")
-            f.write("### By Category\n")
-            for category, data in analysis["by_category"].items():
-                f.write(f"- **{category.title()}:** ${data['total']:,.2f}\n")
-            f.write("\n")
-            
-            # Benchmark analysis
-            f.write("## AI-Enhanced Benchmark Analysis\n\n")
-            f.write("### Above Benchmark Items\n")
-            above_benchmark = [b for b in analysis["benchmarks"] if b["status"] == "Above Benchmark"]
-            for benchmark in above_benchmark:
-                f.write(f"- **{benchmark['vendor']}** ({benchmark['category']}): ${benchmark['actual_spend']:,.2f} ({benchmark['variance_percentage']:+.1f}%)\n")
-            f.write("\n")
-            
-            # AI insights
-            f.write("## AI-Generated Insights\n\n")
-            for benchmark in analysis["benchmarks"][:10]:  # Top 10
-                ai_analysis = benchmark.get("ai_benchmark_analysis", {})
-                if ai_analysis:
-                    f.write(f"### {benchmark['vendor']} - {benchmark['category']}\n")
-                    f.write(f"- **Variance Reason:** {ai_analysis.get('benchmark_assessment', {}).get('variance_reason', 'N/A')}\n")
-                    f.write(f"- **Hidden Costs:** {', '.join(ai_analysis.get('hidden_cost_breakdown', {}).get('identified_costs', []))}\n")
-                    f.write(f"- **Optimization:** {ai_analysis.get('optimization_opportunities', {}).get('immediate_savings', 'N/A')}\n\n")
-            
-            # Recommendations
-            f.write("## AI-Enhanced Recommendations\n\n")
-            for rec in analysis["recommendations"]:
-                f.write(f"### {rec['type'].title()} - {rec['vendor']}\n")
-                f.write(f"- **Priority:** {rec['priority'].title()}\n")
-                f.write(f"- **Message:** {rec['message']}\n")
-                f.write(f"- **Potential Savings:** {rec['potential_savings']}\n")
-                f.write(f"- **Short-term:** {', '.join(rec['ai_insights'].get('short_term', []))}\n")
-                f.write(f"- **Long-term:** {', '.join(rec['ai_insights'].get('long_term', []))}\n\n")
+            f.write("".join(parts))
     
     def run_analysis(self):
         """Run the complete AI-enhanced analysis."""
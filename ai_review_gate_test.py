@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+AI Review Gate Test
+Checks that only overspending and MSP invoices are sent for the Opus benchmark variance review
+"""
+
+import asyncio
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts", "utilities"))
+
+from ai_enhanced_benchmark_analyzer import AIEnhancedBenchmarkAnalyzer, BENCHMARK_VARIANCE_FIELDS
+
+class FakeMessages:
+    """Stands in for the Anthropic messages API, counting variance review calls."""
+    
+    def __init__(self, analyzer):
+        self.analyzer = analyzer
+        self.review_calls = 0
+    
+    async def create(self, **request):
+        if request["model"] != self.analyzer.model_configs["benchmark_analysis"]["model"]:
+            raise AssertionError("only vendors with category rules are used, so no categorization call is expected")
+        self.review_calls += 1
+        body = json.dumps({field: {} for field in BENCHMARK_VARIANCE_FIELDS})
+        return SimpleNamespace(content=[SimpleNamespace(text=body)])
+
+def make_analyzer():
+    """Build an analyzer with a fake API client and empty response caches."""
+    analyzer = AIEnhancedBenchmarkAnalyzer(anthropic_api_key="test")
+    analyzer.categorization_cache = {}
+    analyzer.benchmark_variance_cache = {}
+    analyzer.async_client = SimpleNamespace(messages=FakeMessages(analyzer))
+    return analyzer
+
+def test_gate_skips_spend_below_benchmark():
+    """A small invoice far below its benchmark does not need a review; overspend does."""
+    analyzer = make_analyzer()
+    categorization = analyzer.rule_based_categorization({"vendor": "GitHub"})
+    benchmark = analyzer.get_ai_enhanced_benchmark(categorization, 100000)
+    
+    assert not analyzer.needs_ai_variance_review({"vendor": "GitHub"}, 100, benchmark)
+    assert analyzer.needs_ai_variance_review({"vendor": "GitHub"}, benchmark["high"] + 1, benchmark)
+    assert analyzer.needs_ai_variance_review({"vendor": "Synoptek"}, 100, benchmark)
+
+def test_ordinary_invoices_skip_opus_call():
+    """Only the opening invoice, which is all of the spend so far, gets an Opus review."""
+    analyzer = make_analyzer()
+    records = [{"vendor": "AWS", "total_amount": 1000000.0, "line_items": []}]
+    records += [
+        {"vendor": "GitHub", "total_amount": 100.0 + i, "line_items": [{"description": f"Seat {i}"}]}
+        for i in range(20)
+    ]
+    
+    results = asyncio.run(analyzer._run_ai_calls_async(iter(records)))
+    
+    assert len(results) == len(records)
+    assert all(categorization is not None for _, categorization, _ in results)
+    assert analyzer.async_client.messages.review_calls == 1
+
+def main():
+    """Run the AI review gate tests."""
+    test_gate_skips_spend_below_benchmark()
+    test_ordinary_invoices_skip_opus_call()
+    print("AI review gate tests passed")
+
+if __name__ == "__main__":
+    main()
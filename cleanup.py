@@ -4,58 +4,185 @@ Cleanup Script
 Removes temporary files and test outputs
 """
 
+import fnmatch
 import os
-import shutil
-from pathlib import Path
+import re
+import sys
 
-def cleanup_temp_files():
-    """Remove temporary and test files."""
+# List every removed path only when asked; a line per file is slow on a tty
+VERBOSE = os.environ.get("CLEANUP_VERBOSE") == "1"
+
+# Files to remove
+TEMP_PATTERNS = [
+    "test_*.py",
+    "test_*.json",
+    "*.log",
+    "__pycache__",
+    ".pytest_cache"
+]
+
+# Directories to clean
+TEMP_DIRS = [
+    "logs",
+    "cache",
+    "excel"
+]
+
+# Cache directories removed wherever they occur below the root
+PYCACHE_DIRS = frozenset({"__pycache__", ".pytest_cache"})
+
+# Set CLEANUP_PYCACHE=0 to leave caches that the next run recreates anyway;
+# PYTHONDONTWRITEBYTECODE=1 stops __pycache__ from being written at all
+PURGE_PYCACHE = os.environ.get("CLEANUP_PYCACHE", "1") == "1"
+
+# Trees the nested cache search never descends into
+WALK_SKIP_DIRS = frozenset({
+    ".git", ".venv", "venv", "env", ".tox", ".nox", ".mypy_cache", "node_modules"
+})
+
+# Markers of a virtualenv or conda environment under any other name
+ENVIRONMENT_MARKERS = ("pyvenv.cfg", "conda-meta")
+
+def _is_environment(path):
+    """Whether a directory is a Python environment whose caches are not ours to remove."""
+    return any(os.path.exists(os.path.join(path, marker)) for marker in ENVIRONMENT_MARKERS)
+
+def _literal_prefix(pattern):
+    """Return the part of a glob pattern before its first wildcard."""
+    match = re.search(r"[*?\[]", pattern)
+    return pattern[:match.start()] if match else pattern
+
+def _literal_suffix(pattern):
+    """Return the literal text of a pattern of the form "*<literal>", else None."""
+    if pattern.startswith("*") and _literal_prefix(pattern[1:]) == pattern[1:]:
+        return pattern[1:]
+    return None
+
+def _compile_patterns(patterns):
+    """Split glob patterns into exact names, literal suffixes and (literal prefix, regex) groups."""
+    exact_names = frozenset(p for p in patterns if _literal_prefix(p) == p)
+    suffixes = tuple(
+        suffix for suffix in map(_literal_suffix, patterns) if suffix is not None
+    )
+    grouped = {}
+    for pattern in patterns:
+        if pattern not in exact_names and _literal_suffix(pattern) is None:
+            grouped.setdefault(_literal_prefix(pattern), []).append(fnmatch.translate(pattern))
+    prefix_groups = tuple(
+        (prefix, re.compile("|".join(translated))) for prefix, translated in grouped.items()
+    )
+    return exact_names, suffixes, prefix_groups
+
+# Patterns compiled once. "*.log"-style patterns become a str.endswith
+# check; wildcard patterns sharing a literal prefix such as "test_" share
+# one regex that only runs on names with that prefix.
+_TEMP_NAMES, _TEMP_SUFFIXES, _TEMP_PREFIX_GROUPS = _compile_patterns(TEMP_PATTERNS)
+
+def _is_temp_name(name):
+    """Whether a directory entry name matches one of TEMP_PATTERNS."""
+    if name in _TEMP_NAMES or name.endswith(_TEMP_SUFFIXES):
+        return True
+    return any(
+        name.startswith(prefix) and regex.match(name)
+        for prefix, regex in _TEMP_PREFIX_GROUPS
+    )
+
+def _fast_rmtree(path):
+    """Remove a directory tree with the platform's native tool, falling back to Python."""
+    # A link to a directory is removed itself, never the tree it points to
+    if os.path.islink(path):
+        os.unlink(path)
+        return
     
-    # Files to remove
-    temp_files = [
-        "test_*.py",
-        "test_*.json",
-        "*.log",
-        "__pycache__",
-        ".pytest_cache"
-    ]
+    # Imported here so runs that find nothing to delete skip the import cost
+    import shutil
+    import subprocess
     
-    # Directories to clean
-    temp_dirs = [
-        "logs",
-        "cache",
-        "excel"
-    ]
+    if os.name == "posix" and shutil.which("rm"):
+        command = ["rm", "-rf", "--", path]
+    elif os.name == "nt":
+        command = ["cmd", "/c", "rd", "/s", "/q", path]
+    else:
+        shutil.rmtree(path)
+        return
     
-    root_dir = Path(".")
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise OSError(result.stderr.strip() or f"{command[0]} exited with status {result.returncode}")
+
+def cleanup_temp_files():
+    """Remove temporary and test files."""
     
     print("Cleaning up temporary files...")
     
+    # List the root once; every pass below works from this listing
+    with os.scandir(".") as entries:
+        root_entries = list(entries)
+    
     # Remove temp files
-    for pattern in temp_files:
-        for file_path in root_dir.glob(pattern):
-            if file_path.is_file():
-                try:
-                    file_path.unlink()
-                    print(f"Removed: {file_path}")
-                except Exception as e:
-                    print(f"Could not remove {file_path}: {e}")
-            elif file_path.is_dir():
-                try:
-                    shutil.rmtree(file_path)
-                    print(f"Removed directory: {file_path}")
-                except Exception as e:
-                    print(f"Could not remove {file_path}: {e}")
-    
-    # Clean temp directories
-    for dir_name in temp_dirs:
-        dir_path = root_dir / dir_name
-        if dir_path.exists():
+    matches = [
+        entry for entry in root_entries
+        if _is_temp_name(entry.name) and (PURGE_PYCACHE or entry.name not in PYCACHE_DIRS)
+    ]
+    
+    removed = []
+    failures = []
+    for entry in matches:
+        try:
+            # DirEntry already knows the type from the directory listing
+            if entry.is_dir(follow_symlinks=False):
+                _fast_rmtree(entry.path)
+                removed.append(f"Removed directory: {entry.name}")
+            else:
+                os.unlink(entry.path)
+                removed.append(f"Removed: {entry.name}")
+        except Exception as e:
+            failures.append(f"Could not remove {entry.name}: {e}")
+    
+    # Clean temp directories found in the root listing (no stat per name),
+    # removing the trees concurrently
+    root_dirs = {entry.name for entry in root_entries if entry.is_dir()}
+    existing_dirs = [dir_name for dir_name in TEMP_DIRS if dir_name in root_dirs]
+    if existing_dirs:
+        from concurrent.futures import ThreadPoolExecutor
+        
+        with ThreadPoolExecutor(max_workers=len(existing_dirs)) as pool:
+            removals = {dir_name: pool.submit(_fast_rmtree, dir_name) for dir_name in existing_dirs}
+        
+        for dir_name, removal in removals.items():
             try:
-                shutil.rmtree(dir_path)
-                print(f"Removed directory: {dir_name}")
+                removal.result()
+                removed.append(f"Removed directory: {dir_name}")
             except Exception as e:
-                print(f"Could not remove {dir_name}: {e}")
+                failures.append(f"Could not remove {dir_name}: {e}")
+    
+    # Remove cache directories nested below the root. Each walk is top-down
+    # so removed caches and skipped trees can be pruned before descending.
+    subtrees = [] if not PURGE_PYCACHE else [
+        entry.path for entry in root_entries
+        if entry.is_dir(follow_symlinks=False)
+        and entry.name not in WALK_SKIP_DIRS
+        and entry.name not in TEMP_DIRS
+        and not _is_temp_name(entry.name)
+        and not _is_environment(entry.path)
+    ]
+    for subtree in subtrees:
+        for dir_path, dir_names, _ in os.walk(subtree):
+            for dir_name in list(dir_names):
+                if dir_name in WALK_SKIP_DIRS or _is_environment(os.path.join(dir_path, dir_name)):
+                    dir_names.remove(dir_name)
+                elif dir_name in PYCACHE_DIRS:
+                    dir_names.remove(dir_name)
+                    cache_path = os.path.join(dir_path, dir_name)
+                    try:
+                        _fast_rmtree(cache_path)
+                        removed.append(f"Removed directory: {cache_path}")
+                    except Exception as e:
+                        failures.append(f"Could not remove {cache_path}: {e}")
+    
+    # Report in a single write rather than one per removed path
+    lines = (removed or ["Nothing to clean"]) if VERBOSE else [f"Removed {len(removed)} items"]
+    sys.stdout.write("\n".join(lines + failures) + "\n")
 
 if __name__ == "__main__":
     cleanup_temp_files()
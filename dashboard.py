@@ -4,72 +4,306 @@ Interactive Dashboard for Licensing Analysis
 Web-based dashboard with interactive charts and real-time data
 """
 
-import json
+import functools
+import heapq
 import os
 import re
+import shutil
+import threading
+import time
+import zlib
+from collections import Counter
 from datetime import datetime
-from collections import defaultdict
-from flask import Flask, render_template, jsonify
-import plotly.graph_objs as go
-import plotly.utils
-import plotly.express as px
-import pandas as pd
-import numpy as np
+from operator import itemgetter
+from flask import Flask, Response, g, render_template, request
+from flask.json.provider import JSONProvider
+from flask_compress import Compress
+import orjson
+import vendor_consolidation
+
+# pandas, NumPy and Plotly are imported where they are used, so importing
+# this module (e.g. in the debug reloader's watcher process) stays cheap
 
 app = Flask(__name__)
+# Brotli for browsers that accept it, gzip otherwise; level 4 keeps
+# compressing the chart JSON cheap enough to do on every request
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_MIN_SIZE'] = 1024
+app.config['COMPRESS_LEVEL'] = 4
+app.config['COMPRESS_BR_LEVEL'] = 4
+Compress(app)
+
+# orjson options for every JSON response: NumPy values and naive datetimes (as UTC)
+JSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC
+# Figures keep naive datetimes as they are, so date axes aren't shifted to UTC
+FIGURE_JSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+# How often the background thread checks the input files for changes
+REFRESH_INTERVAL_SECONDS = float(os.environ.get("DASHBOARD_REFRESH_SECONDS", "5"))
+# How often an open dashboard page polls /api/bootstrap
+PAGE_POLL_SECONDS = 30
+
+MONTH_NAMES = ('January', 'February', 'March', 'April', 'May', 'June',
+               'July', 'August', 'September', 'October', 'November', 'December')
+MONTH_NUMBERS = {name: number for number, name in enumerate(MONTH_NAMES, 1)}
+
+# Invoice fields the dashboard reads, with the value used when one is missing
+INVOICE_FIELD_DEFAULTS = {
+    'vendor': 'Unknown',
+    'total_amount': 0,
+    'invoice_date': '',
+    'bill_to': ''
+}
+
+# Benchmark (low, high) as a share of actual spend, used when the industry
+# analysis has no data for a category
+FALLBACK_BENCHMARK_RATIOS = {
+    "it_services": (0.15, 0.30),
+    "development_tools": (0.05, 0.12),
+    "enterprise_software": (0.12, 0.25),
+    "security_software": (0.08, 0.15),
+    "cloud_services": (0.10, 0.18)
+}
+DEFAULT_BENCHMARK_RATIOS = (0.10, 0.20)
+
+# Company patterns with better consolidation, combined into one
+# alternation so each bill_to is scanned once
+COMPANY_PATTERNS = [
+    (r'great\s+gray\s+(?:trust\s+)?company', 'Great Gray Trust Company'),
+    (r'great\s+gray\s+market', 'Great Gray Market'),
+    (r'great\s+gray', 'Great Gray'),
+    (r'rpag', 'RPAG'),
+    (r'retirement\s+plan\s+advisory\s+group', 'RPAG'),
+    (r'flexpath\s+(?:advisors?|partners?)', 'Flexpath'),
+    (r'flexpath', 'Flexpath')
+]
+_COMPANY_RE = re.compile(
+    '|'.join(f'(?P<c{i}>{pattern})' for i, (pattern, _) in enumerate(COMPANY_PATTERNS)),
+    re.IGNORECASE
+)
+_COMPANY_NAMES = {f'c{i}': company_name for i, (_, company_name) in enumerate(COMPANY_PATTERNS)}
+
+# Vendor categorization; the first key found in the vendor name wins
+VENDOR_CATEGORIES = {
+    "synoptek": "it_services",
+    "atlassian": "development_tools",
+    "microsoft": "enterprise_software",
+    "oracle": "enterprise_software",
+    "salesforce": "enterprise_software",
+    "aws": "cloud_services",
+    "amazon": "cloud_services",
+    "azure": "cloud_services",
+    "google": "cloud_services",
+    "gcp": "cloud_services",
+    "github": "development_tools",
+    "gitlab": "development_tools",
+    "crowdstrike": "security_software",
+    "sentinelone": "security_software",
+    "palo alto": "security_software",
+    "proofpoint": "security_software",
+    "harman": "it_services",
+    "markov": "it_services"
+}
+
+# Date patterns, compiled once rather than on every parse_date call
+_YEAR_RE = re.compile(r'20\d{2}')
+_NUMERIC_MONTH_RE = re.compile(r'(\d{1,2})/\d{1,2}/20\d{2}')
+# One alternation for all months, each group named after its month; the
+# three-letter abbreviation also matches the full name
+_MONTH_RE = re.compile('|'.join(f'(?P<{name}>{name[:3]})' for name in MONTH_NAMES), re.IGNORECASE)
+
+def read_json_file(path):
+    """Decode a JSON file with orjson, or return None if it doesn't exist."""
+    try:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    except FileNotFoundError:
+        return None
+
+@functools.cache
+def plotly_json_default():
+    """Get the fallback orjson uses for values it can't encode natively (one shared PlotlyJSONEncoder)."""
+    import plotly.utils
+    
+    return plotly.utils.PlotlyJSONEncoder().default
+
+def figure_json(fig):
+    """Serialize a Plotly figure to JSON bytes with orjson."""
+    return orjson.dumps(
+        fig.to_plotly_json(),
+        default=plotly_json_default(),
+        option=FIGURE_JSON_OPTIONS
+    )
+
+def json_response(payload):
+    """Build a JSON response encoded with orjson."""
+    return Response(orjson.dumps(payload, option=JSON_OPTIONS), mimetype='application/json')
+
+class ORJSONProvider(JSONProvider):
+    """Flask JSON provider backed by orjson, so jsonify and request.get_json use it too."""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=JSON_OPTIONS).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        return json_response(self._prepare_response_obj(args, kwargs))
+
+app.json = ORJSONProvider(app)
+
+def analyzed(method):
+    """Make a DashboardData getter load the input files on first use and reuse its result until they change."""
+    @functools.wraps(method)
+    def wrapper(self):
+        # While a reload precomputes results they go into its new cache
+        results = getattr(self.building, 'results', None)
+        if results is None:
+            if self.input_signature is None:
+                self.refresh()
+            results = self.results_cache
+        if method.__name__ not in results:
+            results[method.__name__] = method(self)
+        return results[method.__name__]
+    wrapper.cached_per_load = True
+    return wrapper
 
 class DashboardData:
     def __init__(self):
         # Use the cleaned data file from the executive directory
-        self.data_file = "reports/current/cleaned_licensing_data_20250725.json"
+        self.cleaned_data_file = "reports/current/cleaned_licensing_data_20250725.json"
+        # Fallback to original file if cleaned data doesn't exist
+        self.fallback_data_file = "reports/processed_licensing_data.json"
         # Load enhanced industry analysis for benchmark data
         self.industry_analysis_file = "reports/current/enhanced_industry_analysis_20250725.json"
         # Load AI-enhanced analysis for advanced insights
         self.ai_enhanced_analysis_file = "reports/current/ai_enhanced_industry_analysis_20250725.json"
-        self.load_data()
-        self.load_industry_analysis()
-        self.load_ai_enhanced_analysis()
-        self.analyze_data()
+        # Results of the get_* methods, built once per load of the input files
+        self.results_cache = {}
+        # Nothing is loaded until a getter or request first needs the data
+        self.input_signature = None
+        self.data_version = None
+        # data_version of the results in results_cache, used as the /api ETag
+        self.results_version = None
+        self.refresh_lock = threading.Lock()
+        # Results being precomputed by the thread that is reloading the data
+        self.building = threading.local()
+        self.refresh_thread = None
+    
+    def get_input_signature(self):
+        """Get the modification time and size of each input file (None if missing)."""
+        signature = []
+        for path in (self.cleaned_data_file, self.fallback_data_file,
+                     self.industry_analysis_file, self.ai_enhanced_analysis_file):
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+    
+    def refresh(self):
+        """Reload and re-analyze the input files if any of them changed since the last load."""
+        with self.refresh_lock:
+            signature = self.get_input_signature()
+            if signature == self.input_signature:
+                return False
+            
+            self.data_file = self.cleaned_data_file
+            self.load_data()
+            self.load_industry_analysis()
+            self.load_ai_enhanced_analysis()
+            self.analyze_data()
+            
+            # Same in every worker process, so clients can tell when the data (or
+            # this module) really changed
+            code_signature = os.stat(__file__).st_mtime_ns
+            self.data_version = format(zlib.crc32(repr((signature, code_signature)).encode()), '08x')
+            
+            # Requests keep reading the previous results until the new set is complete
+            self.building.results = results = {}
+            try:
+                self.precompute_results()
+            finally:
+                del self.building.results
+            self.results_cache = results
+            self.results_version = self.data_version
+            # Recorded last, so a failed load is retried rather than treated as done
+            self.input_signature = signature
+            return True
+    
+    def start_auto_refresh(self):
+        """Load the data if needed and start the thread that reloads it when the input files change."""
+        if self.refresh_thread is None:
+            with self.refresh_lock:
+                if self.refresh_thread is None:
+                    self.refresh_thread = threading.Thread(target=self.auto_refresh, daemon=True)
+                    self.refresh_thread.start()
+        if self.input_signature is None:
+            self.refresh()
+    
+    def auto_refresh(self):
+        """Reload the data in the background whenever the input files change."""
+        while True:
+            time.sleep(REFRESH_INTERVAL_SECONDS)
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Warning: Could not refresh dashboard data: {e}")
+    
+    def precompute_results(self):
+        """Build every cached get_* result up front, so requests after a load only read them."""
+        for name, attribute in vars(DashboardData).items():
+            if getattr(attribute, 'cached_per_load', False):
+                try:
+                    getattr(self, name)()
+                except Exception as e:
+                    # Left uncached; the endpoint raises it again when requested
+                    print(f"Warning: Could not precompute {name}: {e}")
     
     def load_data(self):
         """Load and prepare data for dashboard."""
-        if not os.path.exists(self.data_file):
+        records = read_json_file(self.data_file)
+        if records is None:
             print(f"Warning: Data file {self.data_file} not found. Trying fallback...")
-            # Fallback to original file if cleaned data doesn't exist
-            fallback_file = "reports/processed_licensing_data.json"
-            if os.path.exists(fallback_file):
-                self.data_file = fallback_file
-                print(f"Using fallback file: {fallback_file}")
-            else:
+            records = read_json_file(self.fallback_data_file)
+            if records is None:
                 print("No data files found!")
-                self.data = []
+                self.invoices = self.to_invoice_columns([])
                 return
+            self.data_file = self.fallback_data_file
+            print(f"Using fallback file: {self.fallback_data_file}")
         
-        with open(self.data_file, 'r') as f:
-            self.data = json.load(f)
-            print(f"Loaded {len(self.data)} records from {self.data_file}")
+        self.invoices = self.to_invoice_columns(records)
+        print(f"Loaded {len(self.invoices)} records from {self.data_file}")
+    
+    def to_invoice_columns(self, records):
+        """Convert invoice records into a columnar frame with defaults for missing fields."""
+        import pandas as pd
+        
+        invoices = pd.DataFrame(records, columns=list(INVOICE_FIELD_DEFAULTS))
+        invoices = invoices.fillna(INVOICE_FIELD_DEFAULTS)
+        invoices['total_amount'] = invoices['total_amount'].astype(float)
+        return invoices
     
     def load_industry_analysis(self):
         """Load enhanced industry analysis data for benchmark comparisons."""
-        self.industry_analysis = {}
-        if os.path.exists(self.industry_analysis_file):
-            with open(self.industry_analysis_file, 'r') as f:
-                self.industry_analysis = json.load(f)
-                print(f"Loaded industry analysis data from {self.industry_analysis_file}")
-        else:
+        self.industry_analysis = read_json_file(self.industry_analysis_file)
+        if self.industry_analysis is None:
             print(f"Warning: Industry analysis file {self.industry_analysis_file} not found")
             self.industry_analysis = {}
+        else:
+            print(f"Loaded industry analysis data from {self.industry_analysis_file}")
     
     def load_ai_enhanced_analysis(self):
         """Load AI-enhanced analysis data for advanced insights."""
-        self.ai_enhanced_analysis = {}
-        if os.path.exists(self.ai_enhanced_analysis_file):
-            with open(self.ai_enhanced_analysis_file, 'r') as f:
-                self.ai_enhanced_analysis = json.load(f)
-                print(f"Loaded AI-enhanced analysis data from {self.ai_enhanced_analysis_file}")
-        else:
+        self.ai_enhanced_analysis = read_json_file(self.ai_enhanced_analysis_file)
+        if self.ai_enhanced_analysis is None:
             print(f"Warning: AI-enhanced analysis file {self.ai_enhanced_analysis_file} not found")
             self.ai_enhanced_analysis = {}
+        else:
+            print(f"Loaded AI-enhanced analysis data from {self.ai_enhanced_analysis_file}")
     
     def parse_date(self, date_str):
         """Parse various date formats and extract year and month."""
@@ -77,102 +311,52 @@ class DashboardData:
             return None, None
         
         # Try to extract year first
-        year_match = re.search(r'20\d{2}', date_str)
+        year_match = _YEAR_RE.search(date_str)
         year = int(year_match.group()) if year_match else None
         
         # Try to extract month - first check for numeric format (e.g., "3/31/2024")
-        numeric_month_match = re.search(r'(\d{1,2})/\d{1,2}/20\d{2}', date_str)
+        numeric_month_match = _NUMERIC_MONTH_RE.search(date_str)
         if numeric_month_match:
             month_num = int(numeric_month_match.group(1))
-            month_names = ['January', 'February', 'March', 'April', 'May', 'June',
-                          'July', 'August', 'September', 'October', 'November', 'December']
             if 1 <= month_num <= 12:
-                return year, month_names[month_num - 1]
+                return year, MONTH_NAMES[month_num - 1]
         
         # Try to extract month from text format
-        month_patterns = [
-            r'Jan(?:uary)?', r'Feb(?:ruary)?', r'Mar(?:ch)?', r'Apr(?:il)?',
-            r'May', r'Jun(?:e)?', r'Jul(?:y)?', r'Aug(?:ust)?',
-            r'Sep(?:tember)?', r'Oct(?:ober)?', r'Nov(?:ember)?', r'Dec(?:ember)?'
-        ]
-        
-        month_names = ['January', 'February', 'March', 'April', 'May', 'June',
-                      'July', 'August', 'September', 'October', 'November', 'December']
-        
-        for i, pattern in enumerate(month_patterns):
-            if re.search(pattern, date_str, re.IGNORECASE):
-                return year, month_names[i]
+        month_match = _MONTH_RE.search(date_str)
+        if month_match:
+            return year, month_match.lastgroup
         
         return year, None
     
+    def parse_dates(self, date_strings):
+        """Parse a sequence of dates into (year, month) pairs, vectorized where possible."""
+        import numpy as np
+        import pandas as pd
+        
+        # Most invoice dates are M/D/YYYY, which pandas parses in C; any
+        # other format (or a year parse_date wouldn't accept) falls back to it
+        parsed = pd.to_datetime(pd.Series(date_strings, dtype=object), format='%m/%d/%Y', errors='coerce')
+        years = parsed.dt.year
+        vectorized = years.between(2000, 2099).to_numpy()
+        
+        year_months = list(zip(years.fillna(0).astype(int).tolist(), parsed.dt.month_name().tolist()))
+        for i in np.flatnonzero(~vectorized):
+            year_months[i] = self.parse_date(date_strings[i])
+        return year_months
+    
     def consolidate_vendor_name(self, vendor_name):
         """Consolidate vendor names to handle variations."""
-        vendor_lower = vendor_name.lower().strip()
-        
-        # Vendor consolidation rules
-        vendor_mappings = {
-            'synoptek': 'Synoptek',
-            'synoptek, llc': 'Synoptek',
-            'synoptek llc': 'Synoptek',
-            'atlassian': 'Atlassian',
-            'microsoft': 'Microsoft',
-            'oracle': 'Oracle',
-            'salesforce': 'Salesforce',
-            'aws': 'AWS',
-            'amazon': 'AWS',
-            'amazon web services': 'AWS',
-            'azure': 'Microsoft Azure',
-            'google': 'Google',
-            'gcp': 'Google Cloud',
-            'google cloud': 'Google Cloud',
-            'github': 'GitHub',
-            'gitlab': 'GitLab',
-            'crowdstrike': 'CrowdStrike',
-            'sentinelone': 'SentinelOne',
-            'palo alto': 'Palo Alto Networks',
-            'proofpoint': 'Proofpoint',
-            'harman': 'Harman',
-            'harman connected services': 'Harman',
-            'markov': 'Markov Processes',
-            'markov processes': 'Markov Processes',
-            'markov processes international': 'Markov Processes'
-        }
-        
-        # Check for exact matches first
-        for key, value in vendor_mappings.items():
-            if vendor_lower == key:
-                return value
-        
-        # Check for partial matches
-        for key, value in vendor_mappings.items():
-            if key in vendor_lower:
-                return value
-        
-        # Return original name if no match found
-        return vendor_name
+        # Shared with the AI-enhanced analyzer so both group vendors the same way
+        return vendor_consolidation.consolidate_vendor_name(vendor_name)
     
     def extract_company_from_bill_to(self, bill_to):
         """Extract company name from bill_to field."""
         if not bill_to:
             return "Unknown Company"
         
-        # Common company patterns with better consolidation
-        company_patterns = [
-            (r'great\s+gray\s+(?:trust\s+)?company', 'Great Gray Trust Company'),
-            (r'great\s+gray\s+market', 'Great Gray Market'),
-            (r'great\s+gray', 'Great Gray'),
-            (r'rpag', 'RPAG'),
-            (r'retirement\s+plan\s+advisory\s+group', 'RPAG'),
-            (r'flexpath\s+(?:advisors?|partners?)', 'Flexpath'),
-            (r'flexpath', 'Flexpath')
-        ]
-        
-        bill_to_lower = bill_to.lower()
-        
-        for pattern, company_name in company_patterns:
-            match = re.search(pattern, bill_to_lower)
-            if match:
-                return company_name
+        match = _COMPANY_RE.search(bill_to)
+        if match:
+            return _COMPANY_NAMES[match.lastgroup]
         
         # If no pattern matches, try to extract first company-like name
         # Look for words that might be company names (capitalized words)
@@ -189,66 +373,53 @@ class DashboardData:
     
     def analyze_data(self):
         """Analyze data for dashboard visualizations."""
-        # Vendor categorization
-        self.vendor_categories = {
-            "synoptek": "it_services",
-            "atlassian": "development_tools",
-            "microsoft": "enterprise_software",
-            "oracle": "enterprise_software",
-            "salesforce": "enterprise_software",
-            "aws": "cloud_services",
-            "amazon": "cloud_services",
-            "azure": "cloud_services",
-            "google": "cloud_services",
-            "gcp": "cloud_services",
-            "github": "development_tools",
-            "gitlab": "development_tools",
-            "crowdstrike": "security_software",
-            "sentinelone": "security_software",
-            "palo alto": "security_software",
-            "proofpoint": "security_software",
-            "harman": "it_services",
-            "markov": "it_services"
-        }
-        
-        # Categorize data
-        self.categorized_spend = defaultdict(list)
-        self.category_totals = defaultdict(float)
-        self.monthly_data = defaultdict(float)
-        self.yearly_data = defaultdict(float)
-        self.vendor_spend = defaultdict(float)
-        self.company_spend = defaultdict(float)
-        self.vendor_company_spend = defaultdict(lambda: defaultdict(float))
-        
-        for item in self.data:
-            vendor = item.get('vendor', 'Unknown')
-            amount = item.get('total_amount', 0)
-            date_str = item.get('invoice_date', '')
-            bill_to = item.get('bill_to', '')
-            
-            # Consolidate vendor name
-            consolidated_vendor = self.consolidate_vendor_name(vendor)
-            
-            # Extract company from bill_to
-            company = self.extract_company_from_bill_to(bill_to)
-            
-            category = self.categorize_vendor(consolidated_vendor)
-            
-            self.categorized_spend[category].append(item)
-            self.category_totals[category] += amount
-            self.vendor_spend[consolidated_vendor] += amount
-            self.company_spend[company] += amount
-            self.vendor_company_spend[consolidated_vendor][company] += amount
-            
-            # Parse date for trend analysis
-            year, month = self.parse_date(date_str)
-            if year and month:
-                self.monthly_data[f"{month} {year}"] += amount
-                self.yearly_data[year] += amount
+        import numpy as np
+        import pandas as pd
+        
+        invoices = self.invoices
+        
+        # Parse all invoice dates in one pass
+        year_months = self.parse_dates(invoices['invoice_date'].tolist())
+        
+        # Resolve names per distinct value, then let pandas do the summing
+        spend = pd.DataFrame({
+            'vendor': self.resolve_unique(invoices['vendor'], self.consolidate_vendor_name),
+            'company': self.resolve_unique(invoices['bill_to'], self.extract_company_from_bill_to),
+            'amount': invoices['total_amount'],
+            'year': pd.Series([year for year, _ in year_months], dtype=float),
+            'month': pd.Series([month for _, month in year_months], dtype=object),
+        })
+        vendor_categories = {vendor: self.categorize_vendor(vendor) for vendor in spend['vendor'].unique()}
+        spend['category'] = spend['vendor'].map(vendor_categories)
+        
+        # Categorize data (all groupings keep first-seen order)
+        category_counts = spend.groupby('category', sort=False).size()
+        self.category_invoice_counts = dict(zip(category_counts.index.tolist(), category_counts.tolist()))
+        self.category_totals = self.sum_by(spend, 'category')
+        self.vendor_spend = self.sum_by(spend, 'vendor')
+        self.company_spend = self.sum_by(spend, 'company')
+        
+        # Dense vendor x company matrix; rows and columns follow the order
+        # of vendor_spend and company_spend
+        vendor_index = pd.Index(list(self.vendor_spend)).get_indexer(spend['vendor'])
+        company_index = pd.Index(list(self.company_spend)).get_indexer(spend['company'])
+        shape = (len(self.vendor_spend), len(self.company_spend))
+        cells = np.ravel_multi_index((vendor_index, company_index), shape)
+        self.vendor_company_spend = np.bincount(
+            cells, weights=spend['amount'].to_numpy(), minlength=shape[0] * shape[1]
+        ).reshape(shape)
+        
+        # Trend analysis only covers rows with both a year and a month
+        dated = spend[spend['year'].notna() & spend['month'].notna()].copy()
+        dated['year'] = dated['year'].astype(int)
+        dated['month_num'] = dated['month'].map(MONTH_NUMBERS)
+        # Keyed by (year, month number) and stored in chronological order
+        self.monthly_data = dict(sorted(self.sum_by(dated, ['year', 'month_num']).items()))
+        self.yearly_data = self.sum_by(dated, 'year')
         
         # Calculate metrics
         self.total_spend = sum(self.category_totals.values())
-        self.total_invoices = len(self.data)
+        self.total_invoices = len(invoices)
         self.vendor_count = len(self.vendor_spend)
         self.company_count = len(self.company_spend)
         
@@ -257,18 +428,33 @@ class DashboardData:
         print(f"Consolidated vendors: {len(self.vendor_spend)}")
         print(f"Companies identified: {len(self.company_spend)}")
     
+    def resolve_unique(self, values, resolve):
+        """Apply a name resolver once per distinct value and broadcast the results."""
+        import pandas as pd
+        
+        values = pd.Series(values, dtype=object)
+        return values.map({value: resolve(value) for value in values.unique()})
+    
+    def sum_by(self, spend, key):
+        """Sum spend amounts per value of a column, in first-seen order."""
+        totals = spend.groupby(key, sort=False)['amount'].sum()
+        return dict(zip(totals.index.tolist(), totals.tolist()))
+    
     def categorize_vendor(self, vendor_name):
         """Categorize vendor based on name."""
         vendor_lower = vendor_name.lower()
         
-        for vendor_key, category in self.vendor_categories.items():
+        for vendor_key, category in VENDOR_CATEGORIES.items():
             if vendor_key in vendor_lower:
                 return category
         
         return "it_services"
     
+    @analyzed
     def get_spending_pie_chart(self):
         """Create spending distribution pie chart."""
+        import plotly.graph_objs as go
+        
         categories = []
         amounts = []
         
@@ -292,13 +478,16 @@ class DashboardData:
             height=500
         )
         
-        return json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
+        return figure_json(fig)
     
+    @analyzed
     def get_vendor_bar_chart(self):
         """Create vendor spending bar chart."""
+        import plotly.graph_objs as go
+        
         # Get top 10 vendors
-        top_vendors = sorted(self.vendor_spend.items(), key=lambda x: x[1], reverse=True)[:10]
-        vendors, amounts = zip(*top_vendors)
+        top_vendors = heapq.nlargest(10, self.vendor_spend.items(), key=itemgetter(1))
+        vendors, amounts = zip(*top_vendors) if top_vendors else ((), ())
         
         fig = go.Figure(data=[go.Bar(
             x=vendors,
@@ -317,13 +506,16 @@ class DashboardData:
             xaxis_tickangle=-45
         )
         
-        return json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
+        return figure_json(fig)
     
+    @analyzed
     def get_company_bar_chart(self):
         """Create company spending bar chart."""
+        import plotly.graph_objs as go
+        
         # Get top 10 companies
-        top_companies = sorted(self.company_spend.items(), key=lambda x: x[1], reverse=True)[:10]
-        companies, amounts = zip(*top_companies)
+        top_companies = heapq.nlargest(10, self.company_spend.items(), key=itemgetter(1))
+        companies, amounts = zip(*top_companies) if top_companies else ((), ())
         
         fig = go.Figure(data=[go.Bar(
             x=companies,
@@ -342,29 +534,30 @@ class DashboardData:
             xaxis_tickangle=-45
         )
         
-        return json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
+        return figure_json(fig)
     
+    @analyzed
     def get_vendor_company_heatmap(self):
         """Create vendor vs company spending heatmap."""
+        import numpy as np
+        import plotly.graph_objs as go
+        
         # Prepare data for heatmap
         vendors = list(self.vendor_spend.keys())[:8]  # Top 8 vendors
         companies = list(self.company_spend.keys())[:8]  # Top 8 companies
         
-        # Create matrix
-        matrix = []
-        for vendor in vendors:
-            row = []
-            for company in companies:
-                amount = self.vendor_company_spend[vendor].get(company, 0)
-                row.append(amount)
-            matrix.append(row)
+        # Create matrix from the leading rows and columns of the spend matrix
+        matrix = self.vendor_company_spend[:len(vendors), :len(companies)]
+        labels = np.array([f'${val:,.0f}' for val in matrix.ravel()], dtype=object).reshape(matrix.shape)
         
+        # Plain lists: Plotly would encode ndarrays as typed-array blobs,
+        # which the dashboard's plotly.js build doesn't read
         fig = go.Figure(data=go.Heatmap(
-            z=matrix,
+            z=matrix.tolist(),
             x=companies,
             y=vendors,
             colorscale='Viridis',
-            text=[[f'${val:,.0f}' if val > 0 else '' for val in row] for row in matrix],
+            text=np.where(matrix > 0, labels, '').tolist(),
             texttemplate="%{text}",
             textfont={"size": 10},
             hoverongaps=False
@@ -378,22 +571,19 @@ class DashboardData:
             height=500
         )
         
-        return json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
+        return figure_json(fig)
     
+    @analyzed
     def get_monthly_trend_chart(self):
         """Create monthly spending trend chart with proper date handling."""
+        import plotly.graph_objs as go
+        
         if not self.monthly_data:
             return None
         
-        # Sort months chronologically
-        def sort_month_year(month_year):
-            month, year = month_year.rsplit(' ', 1)
-            month_order = ['January', 'February', 'March', 'April', 'May', 'June',
-                          'July', 'August', 'September', 'October', 'November', 'December']
-            return (int(year), month_order.index(month))
-        
-        sorted_months = sorted(self.monthly_data.items(), key=lambda x: sort_month_year(x[0]))
-        months, amounts = zip(*sorted_months)
+        # monthly_data is already in chronological order
+        months = [f"{MONTH_NAMES[month_num - 1]} {year}" for year, month_num in self.monthly_data]
+        amounts = list(self.monthly_data.values())
         
         fig = go.Figure(data=[go.Scatter(
             x=months,
@@ -414,10 +604,13 @@ class DashboardData:
             xaxis_tickangle=-45
         )
         
-        return json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
+        return figure_json(fig)
     
+    @analyzed
     def get_yearly_comparison_chart(self):
         """Create yearly spending comparison chart."""
+        import plotly.graph_objs as go
+        
         if len(self.yearly_data) < 2:
             return None
         
@@ -440,44 +633,33 @@ class DashboardData:
             height=400
         )
         
-        return json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
+        return figure_json(fig)
     
+    @analyzed
     def get_benchmark_comparison_chart(self):
         """Create industry benchmark comparison chart."""
-        categories = []
-        actual_spend = []
-        benchmark_low = []
-        benchmark_high = []
-        
-        for category, spend in self.category_totals.items():
-            categories.append(category.replace('_', ' ').title())
-            actual_spend.append(spend)
-            
-            # Use actual industry benchmark data if available
-            if 'benchmarks' in self.industry_analysis and category in self.industry_analysis['benchmarks']:
-                benchmark_data = self.industry_analysis['benchmarks'][category]['benchmark']
-                benchmark_low.append(benchmark_data['low'])
-                benchmark_high.append(benchmark_data['high'])
-            else:
-                # Fallback to simplified benchmark calculation if no specific data
-                if category == "it_services":
-                    benchmark_low.append(spend * 0.15)
-                    benchmark_high.append(spend * 0.30)
-                elif category == "development_tools":
-                    benchmark_low.append(spend * 0.05)
-                    benchmark_high.append(spend * 0.12)
-                elif category == "enterprise_software":
-                    benchmark_low.append(spend * 0.12)
-                    benchmark_high.append(spend * 0.25)
-                elif category == "security_software":
-                    benchmark_low.append(spend * 0.08)
-                    benchmark_high.append(spend * 0.15)
-                elif category == "cloud_services":
-                    benchmark_low.append(spend * 0.10)
-                    benchmark_high.append(spend * 0.18)
-                else:
-                    benchmark_low.append(spend * 0.10)
-                    benchmark_high.append(spend * 0.20)
+        import numpy as np
+        import plotly.graph_objs as go
+        
+        categories = [category.replace('_', ' ').title() for category in self.category_totals]
+        actual_spend = list(self.category_totals.values())
+        
+        # Simplified benchmark ranges, one vectorized multiply per bound
+        low_ratios, high_ratios = np.array(
+            [FALLBACK_BENCHMARK_RATIOS.get(category, DEFAULT_BENCHMARK_RATIOS) for category in self.category_totals],
+            dtype=float
+        ).reshape(-1, 2).T
+        spends = np.array(actual_spend, dtype=float)
+        benchmark_low = (spends * low_ratios).tolist()
+        benchmark_high = (spends * high_ratios).tolist()
+        
+        # Use actual industry benchmark data where available
+        industry_benchmarks = self.industry_analysis.get('benchmarks', {})
+        for i, category in enumerate(self.category_totals):
+            if category in industry_benchmarks:
+                benchmark_data = industry_benchmarks[category]['benchmark']
+                benchmark_low[i] = benchmark_data['low']
+                benchmark_high[i] = benchmark_data['high']
         
         fig = go.Figure()
         
@@ -507,8 +689,9 @@ class DashboardData:
             xaxis_tickangle=-45
         )
         
-        return json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
+        return figure_json(fig)
     
+    @analyzed
     def get_summary_metrics(self):
         """Get summary metrics for dashboard."""
         return {
@@ -521,12 +704,13 @@ class DashboardData:
             'years_analyzed': ', '.join(map(str, sorted(self.yearly_data.keys())))
         }
     
+    @analyzed
     def get_category_details(self):
         """Get detailed category information."""
         details = []
         
         for category, spend in sorted(self.category_totals.items(), key=lambda x: x[1], reverse=True):
-            invoice_count = len(self.categorized_spend[category])
+            invoice_count = self.category_invoice_counts[category]
             percentage = (spend / self.total_spend) * 100 if self.total_spend > 0 else 0
             
             details.append({
@@ -539,6 +723,7 @@ class DashboardData:
         
         return details
     
+    @analyzed
     def get_company_details(self):
         """Get detailed company information."""
         details = []
@@ -554,6 +739,7 @@ class DashboardData:
         
         return details
     
+    @analyzed
     def get_benchmark_details(self):
         """Get detailed benchmark comparison information."""
         details = []
@@ -581,6 +767,7 @@ class DashboardData:
         
         return details
     
+    @analyzed
     def get_recommendations(self):
         """Get cost optimization recommendations."""
         recommendations = []
@@ -601,8 +788,11 @@ class DashboardData:
         
         return recommendations
     
+    @analyzed
     def get_enhanced_benchmark_chart(self):
         """Create enhanced benchmark comparison chart with actual vs benchmark data."""
+        import plotly.graph_objs as go
+        
         if 'benchmarks' not in self.industry_analysis:
             return self.get_benchmark_comparison_chart()  # Fallback to original
         
@@ -685,14 +875,16 @@ class DashboardData:
             )
         )
         
-        return json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
+        return figure_json(fig)
     
+    @analyzed
     def get_ai_enhanced_insights(self):
         """Get AI-enhanced insights and analysis."""
         if not self.ai_enhanced_analysis:
             return {
                 "ai_categorizations": [],
                 "hidden_costs": [],
+                "hidden_cost_frequency": {},
                 "msp_analysis": [],
                 "optimization_opportunities": []
             }
@@ -741,26 +933,23 @@ class DashboardData:
                             "opportunities": optimization.get('strategic_opportunities', [])
                         })
         
+        # How often each hidden cost is flagged, in first-seen order
+        insights["hidden_cost_frequency"] = dict(Counter(insights["hidden_costs"]))
+        
         return insights
     
+    @analyzed
     def get_ai_enhanced_chart(self):
         """Get AI-enhanced analysis chart showing categorization and insights."""
+        import plotly.graph_objs as go
+        
         insights = self.get_ai_enhanced_insights()
         
         if not insights["ai_categorizations"]:
-            return json.dumps(go.Figure().update_layout(title="No AI-enhanced data available"), 
-                            cls=plotly.utils.PlotlyJSONEncoder)
+            return figure_json(go.Figure().update_layout(title="No AI-enhanced data available"))
         
-        # Create categorization breakdown
-        categories = {}
-        subcategories = {}
-        
-        for cat in insights["ai_categorizations"]:
-            category = cat['category']
-            subcategory = cat['subcategory']
-            
-            categories[category] = categories.get(category, 0) + 1
-            subcategories[subcategory] = subcategories.get(subcategory, 0) + 1
+        # Create categorization breakdown (in first-seen order)
+        categories = Counter(cat['category'] for cat in insights["ai_categorizations"])
         
         # Create the chart
         fig = go.Figure()
@@ -782,30 +971,99 @@ class DashboardData:
             height=500
         )
         
-        return json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
+        return figure_json(fig)
+    
+    def bootstrap_section(self, getter):
+        """Call a get_* method for the bootstrap payload, or return None if it fails."""
+        try:
+            return getter()
+        except Exception as e:
+            # One broken panel should not blank the rest of the dashboard
+            print(f"Warning: Could not build {getter.__name__} for the dashboard: {e}")
+            return None
+    
+    @analyzed
+    def get_bootstrap(self):
+        """Get every dashboard panel as one encoded JSON payload."""
+        section = self.bootstrap_section
+        charts = {
+            'spending_pie': section(self.get_spending_pie_chart),
+            'vendor_bar': section(self.get_vendor_bar_chart),
+            'company_bar': section(self.get_company_bar_chart),
+            'vendor_company_heatmap': section(self.get_vendor_company_heatmap),
+            'monthly_trend': section(self.get_monthly_trend_chart),
+            'yearly_comparison': section(self.get_yearly_comparison_chart),
+            'enhanced_benchmark': section(self.get_enhanced_benchmark_chart),
+            'benchmark_comparison': section(self.get_benchmark_comparison_chart),
+            'ai_enhanced': section(self.get_ai_enhanced_chart)
+        }
+        
+        return orjson.dumps({
+            'version': self.data_version,
+            'summary': section(self.get_summary_metrics),
+            'categories': section(self.get_category_details),
+            'companies': section(self.get_company_details),
+            'charts': {name: orjson.loads(chart) if chart else None
+                       for name, chart in charts.items()},
+            'benchmarks': section(self.get_benchmark_details),
+            'recommendations': section(self.get_recommendations),
+            'ai_insights': section(self.get_ai_enhanced_insights)
+        }, option=JSON_OPTIONS)
 
 # Initialize dashboard data
 dashboard_data = DashboardData()
 
+@app.before_request
+def refresh_dashboard_data():
+    """Load the report files on the first request; later changes are picked up in the background."""
+    try:
+        dashboard_data.start_auto_refresh()
+    except Exception as e:
+        print(f"Warning: Could not load dashboard data: {e}")
+    
+    # Until one load has completed there is nothing consistent to serve
+    if request.path.startswith('/api/') and dashboard_data.results_version is None:
+        return Response(status=503)
+    
+    # Taken before the route reads the results, so a reload in between can
+    # only make the ETag older than the body, never newer
+    g.results_version = dashboard_data.results_version
+    if request.path.startswith('/api/') and request.if_none_match.contains_weak(g.results_version):
+        return Response(status=304)
+
+@app.after_request
+def tag_api_response(response):
+    """Tag /api responses with the data version so polls can revalidate with If-None-Match."""
+    if request.path.startswith('/api/') and response.status_code in (200, 304):
+        # Weak, so it survives Flask-Compress re-encoding the body
+        response.set_etag(g.results_version, weak=True)
+        response.cache_control.no_cache = True
+    return response
+
 @app.route('/')
 def index():
     """Main dashboard page."""
-    return render_template('dashboard.html')
+    return render_template('dashboard.html', poll_seconds=PAGE_POLL_SECONDS)
+
+@app.route('/api/bootstrap')
+def get_bootstrap():
+    """Get all dashboard panels in a single response."""
+    return Response(dashboard_data.get_bootstrap(), mimetype='application/json')
 
 @app.route('/api/summary')
 def get_summary():
     """Get summary metrics."""
-    return jsonify(dashboard_data.get_summary_metrics())
+    return json_response(dashboard_data.get_summary_metrics())
 
 @app.route('/api/categories')
 def get_categories():
     """Get category details."""
-    return jsonify(dashboard_data.get_category_details())
+    return json_response(dashboard_data.get_category_details())
 
 @app.route('/api/companies')
 def get_companies():
     """Get company details."""
-    return jsonify(dashboard_data.get_company_details())
+    return json_response(dashboard_data.get_company_details())
 
 @app.route('/api/charts/spending-pie')
 def get_spending_pie():
@@ -850,535 +1108,41 @@ def get_enhanced_benchmark():
 @app.route('/api/benchmarks')
 def get_benchmarks():
     """Get detailed benchmark information."""
-    return jsonify(dashboard_data.get_benchmark_details())
+    return json_response(dashboard_data.get_benchmark_details())
 
 @app.route('/api/recommendations')
 def get_recommendations():
     """Get cost optimization recommendations."""
-    return jsonify(dashboard_data.get_recommendations())
+    return json_response(dashboard_data.get_recommendations())
 
 @app.route('/api/ai-insights')
 def get_ai_insights():
     """Get AI-enhanced insights data."""
-    return jsonify(dashboard_data.get_ai_enhanced_insights())
+    return json_response(dashboard_data.get_ai_enhanced_insights())
 
 @app.route('/api/charts/ai-enhanced')
 def get_ai_enhanced_chart():
     """Get AI-enhanced analysis chart."""
     return dashboard_data.get_ai_enhanced_chart()
 
-def create_dashboard_template():
-    """Create the HTML template for the dashboard."""
-    template_dir = "templates"
-    os.makedirs(template_dir, exist_ok=True)
-    
-    html_content = """
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Licensing Analysis Dashboard</title>
-    <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
-    <script src="https://code.jquery.com/jquery-3.6.0.min.js"></script>
-    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/css/bootstrap.min.css" rel="stylesheet">
-    <style>
-        body { background-color: #f8f9fa; }
-        .metric-card { background: white; border-radius: 10px; padding: 20px; margin: 10px 0; box-shadow: 0 2px 4px rgba(0,0,0,0.1); }
-        .chart-container { background: white; border-radius: 10px; padding: 20px; margin: 10px 0; box-shadow: 0 2px 4px rgba(0,0,0,0.1); }
-        .metric-value { font-size: 2rem; font-weight: bold; color: #007bff; }
-        .metric-label { color: #6c757d; font-size: 0.9rem; }
-        .table-container { background: white; border-radius: 10px; padding: 20px; margin: 10px 0; box-shadow: 0 2px 4px rgba(0,0,0,0.1); }
-        .nav-tabs .nav-link { color: #495057; }
-        .nav-tabs .nav-link.active { color: #007bff; font-weight: bold; }
-    </style>
-</head>
-<body>
-    <div class="container-fluid">
-        <div class="row">
-            <div class="col-12">
-                <h1 class="text-center my-4">Licensing Analysis Dashboard</h1>
-                <p class="text-center text-muted">Real-time analysis of licensing costs and industry benchmarks (2024-2025)</p>
-            </div>
-        </div>
-        
-        <!-- Summary Metrics -->
-        <div class="row" id="summary-metrics">
-            <div class="col-md-2">
-                <div class="metric-card text-center">
-                    <div class="metric-value" id="total-spend">$0</div>
-                    <div class="metric-label">Total Spend</div>
-                </div>
-            </div>
-            <div class="col-md-2">
-                <div class="metric-card text-center">
-                    <div class="metric-value" id="total-invoices">0</div>
-                    <div class="metric-label">Total Invoices</div>
-                </div>
-            </div>
-            <div class="col-md-2">
-                <div class="metric-card text-center">
-                    <div class="metric-value" id="vendor-count">0</div>
-                    <div class="metric-label">Vendors</div>
-                </div>
-            </div>
-            <div class="col-md-2">
-                <div class="metric-card text-center">
-                    <div class="metric-value" id="company-count">0</div>
-                    <div class="metric-label">Companies</div>
-                </div>
-            </div>
-            <div class="col-md-2">
-                <div class="metric-card text-center">
-                    <div class="metric-value" id="avg-invoice">$0</div>
-                    <div class="metric-label">Avg Invoice</div>
-                </div>
-            </div>
-            <div class="col-md-2">
-                <div class="metric-card text-center">
-                    <div class="metric-value" id="years-analyzed">-</div>
-                    <div class="metric-label">Years Analyzed</div>
-                </div>
-            </div>
-        </div>
-        
-        <!-- Charts Row 1 -->
-        <div class="row">
-            <div class="col-md-6">
-                <div class="chart-container">
-                    <div id="spending-pie-chart"></div>
-                </div>
-            </div>
-            <div class="col-md-6">
-                <div class="chart-container">
-                    <div id="vendor-bar-chart"></div>
-                </div>
-            </div>
-        </div>
-        
-        <!-- Charts Row 2 -->
-        <div class="row">
-            <div class="col-md-6">
-                <div class="chart-container">
-                    <div id="company-bar-chart"></div>
-                </div>
-            </div>
-            <div class="col-md-6">
-                <div class="chart-container">
-                    <div id="vendor-company-heatmap"></div>
-                </div>
-            </div>
-        </div>
-        
-        <!-- Charts Row 3 -->
-        <div class="row">
-            <div class="col-md-6">
-                <div class="chart-container">
-                    <div id="monthly-trend-chart"></div>
-                </div>
-            </div>
-            <div class="col-md-6">
-                <div class="chart-container">
-                    <div id="yearly-comparison-chart"></div>
-                </div>
-            </div>
-        </div>
-        
-        <!-- Charts Row 4 -->
-        <div class="row">
-            <div class="col-12">
-                <div class="chart-container">
-                    <div id="enhanced-benchmark-chart"></div>
-                </div>
-            </div>
-        </div>
-        
-        <!-- Charts Row 5 -->
-        <div class="row">
-            <div class="col-12">
-                <div class="chart-container">
-                    <div id="benchmark-comparison-chart"></div>
-                </div>
-            </div>
-        </div>
-        
-        <!-- Details Tables -->
-        <div class="row">
-            <div class="col-12">
-                <div class="table-container">
-                    <ul class="nav nav-tabs" id="detailsTabs" role="tablist">
-                        <li class="nav-item" role="presentation">
-                            <button class="nav-link active" id="category-tab" data-bs-toggle="tab" data-bs-target="#category-tab-pane" type="button" role="tab">Category Details</button>
-                        </li>
-                        <li class="nav-item" role="presentation">
-                            <button class="nav-link" id="company-tab" data-bs-toggle="tab" data-bs-target="#company-tab-pane" type="button" role="tab">Company Details</button>
-                        </li>
-                        <li class="nav-item" role="presentation">
-                            <button class="nav-link" id="benchmark-tab" data-bs-toggle="tab" data-bs-target="#benchmark-tab-pane" type="button" role="tab">Benchmark Analysis</button>
-                        </li>
-                        <li class="nav-item" role="presentation">
-                            <button class="nav-link" id="recommendations-tab" data-bs-toggle="tab" data-bs-target="#recommendations-tab-pane" type="button" role="tab">Recommendations</button>
-                        </li>
-                        <li class="nav-item" role="presentation">
-                            <button class="nav-link" id="ai-insights-tab" data-bs-toggle="tab" data-bs-target="#ai-insights-tab-pane" type="button" role="tab">AI Insights</button>
-                        </li>
-                    </ul>
-                    <div class="tab-content" id="detailsTabsContent">
-                        <div class="tab-pane fade show active" id="category-tab-pane" role="tabpanel">
-                            <div class="table-responsive">
-                                <table class="table table-striped" id="category-table">
-                                    <thead>
-                                        <tr>
-                                            <th>Category</th>
-                                            <th>Total Spend</th>
-                                            <th>Percentage</th>
-                                            <th>Invoice Count</th>
-                                            <th>Avg Invoice</th>
-                                        </tr>
-                                    </thead>
-                                    <tbody id="category-tbody">
-                                    </tbody>
-                                </table>
-                            </div>
-                        </div>
-                        <div class="tab-pane fade" id="company-tab-pane" role="tabpanel">
-                            <div class="table-responsive">
-                                <table class="table table-striped" id="company-table">
-                                    <thead>
-                                        <tr>
-                                            <th>Company</th>
-                                            <th>Total Spend</th>
-                                            <th>Percentage</th>
-                                        </tr>
-                                    </thead>
-                                    <tbody id="company-tbody">
-                                    </tbody>
-                                </table>
-                            </div>
-                        </div>
-                        <div class="tab-pane fade" id="benchmark-tab-pane" role="tabpanel">
-                            <div class="table-responsive">
-                                <table class="table table-striped" id="benchmark-table">
-                                    <thead>
-                                        <tr>
-                                            <th>Category</th>
-                                            <th>Actual Spend</th>
-                                            <th>Benchmark (Low)</th>
-                                            <th>Benchmark (High)</th>
-                                            <th>Benchmark (Typical)</th>
-                                            <th>Variance</th>
-                                            <th>Status</th>
-                                            <th>% of Total</th>
-                                        </tr>
-                                    </thead>
-                                    <tbody id="benchmark-tbody">
-                                    </tbody>
-                                </table>
-                            </div>
-                        </div>
-                        <div class="tab-pane fade" id="recommendations-tab-pane" role="tabpanel">
-                            <div class="table-responsive">
-                                <table class="table table-striped" id="recommendations-table">
-                                    <thead>
-                                        <tr>
-                                            <th>Type</th>
-                                            <th>Category/Vendor/Company</th>
-                                            <th>Priority</th>
-                                            <th>Message</th>
-                                            <th>Potential Savings</th>
-                                        </tr>
-                                    </thead>
-                                    <tbody id="recommendations-tbody">
-                                    </tbody>
-                                </table>
-                            </div>
-                        </div>
-                        <div class="tab-pane fade" id="ai-insights-tab-pane" role="tabpanel">
-                            <div class="row">
-                                <div class="col-md-6">
-                                    <div class="chart-container">
-                                        <div id="ai-enhanced-chart"></div>
-                                    </div>
-                                </div>
-                                <div class="col-md-6">
-                                    <div class="table-responsive">
-                                        <h5>AI Categorizations</h5>
-                                        <table class="table table-striped" id="ai-categorizations-table">
-                                            <thead>
-                                                <tr>
-                                                    <th>Vendor</th>
-                                                    <th>Category</th>
-                                                    <th>Subcategory</th>
-                                                    <th>Service Type</th>
-                                                    <th>Complexity</th>
-                                                </tr>
-                                            </thead>
-                                            <tbody id="ai-categorizations-tbody">
-                                            </tbody>
-                                        </table>
-                                    </div>
-                                </div>
-                            </div>
-                            <div class="row mt-3">
-                                <div class="col-md-6">
-                                    <div class="table-responsive">
-                                        <h5>Hidden Costs Identified</h5>
-                                        <table class="table table-striped" id="hidden-costs-table">
-                                            <thead>
-                                                <tr>
-                                                    <th>Hidden Cost</th>
-                                                    <th>Frequency</th>
-                                                </tr>
-                                            </thead>
-                                            <tbody id="hidden-costs-tbody">
-                                            </tbody>
-                                        </table>
-                                    </div>
-                                </div>
-                                <div class="col-md-6">
-                                    <div class="table-responsive">
-                                        <h5>MSP Services Analysis</h5>
-                                        <table class="table table-striped" id="msp-services-table">
-                                            <thead>
-                                                <tr>
-                                                    <th>Vendor</th>
-                                                    <th>Services</th>
-                                                </tr>
-                                            </thead>
-                                            <tbody id="msp-services-tbody">
-                                            </tbody>
-                                        </table>
-                                    </div>
-                                </div>
-                            </div>
-                        </div>
-                    </div>
-                </div>
-            </div>
-        </div>
-    </div>
-    
-    <script src="https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/js/bootstrap.bundle.min.js"></script>
-    <script>
-        // Load summary metrics
-        $.get('/api/summary', function(data) {
-            $('#total-spend').text(data.total_spend);
-            $('#total-invoices').text(data.total_invoices);
-            $('#vendor-count').text(data.vendor_count);
-            $('#company-count').text(data.company_count);
-            $('#avg-invoice').text(data.avg_invoice);
-            $('#years-analyzed').text(data.years_analyzed);
-        });
-        
-        // Load category details
-        $.get('/api/categories', function(data) {
-            const tbody = $('#category-tbody');
-            tbody.empty();
-            
-            data.forEach(function(category) {
-                tbody.append(`
-                    <tr>
-                        <td>${category.category}</td>
-                        <td>${category.spend}</td>
-                        <td>${category.percentage}</td>
-                        <td>${category.invoice_count}</td>
-                        <td>${category.avg_invoice}</td>
-                    </tr>
-                `);
-            });
-        });
-        
-        // Load company details
-        $.get('/api/companies', function(data) {
-            const tbody = $('#company-tbody');
-            tbody.empty();
-            
-            data.forEach(function(company) {
-                tbody.append(`
-                    <tr>
-                        <td>${company.company}</td>
-                        <td>${company.spend}</td>
-                        <td>${company.percentage}</td>
-                    </tr>
-                `);
-            });
-        });
-        
-        // Load charts
-        $.get('/api/charts/spending-pie', function(data) {
-            Plotly.newPlot('spending-pie-chart', JSON.parse(data).data, JSON.parse(data).layout);
-        });
-        
-        $.get('/api/charts/vendor-bar', function(data) {
-            Plotly.newPlot('vendor-bar-chart', JSON.parse(data).data, JSON.parse(data).layout);
-        });
-        
-        $.get('/api/charts/company-bar', function(data) {
-            Plotly.newPlot('company-bar-chart', JSON.parse(data).data, JSON.parse(data).layout);
-        });
-        
-        $.get('/api/charts/vendor-company-heatmap', function(data) {
-            Plotly.newPlot('vendor-company-heatmap', JSON.parse(data).data, JSON.parse(data).layout);
-        });
-        
-        $.get('/api/charts/monthly-trend', function(data) {
-            if (data) {
-                Plotly.newPlot('monthly-trend-chart', JSON.parse(data).data, JSON.parse(data).layout);
-            } else {
-                $('#monthly-trend-chart').html('<p class="text-center text-muted">No monthly data available</p>');
-            }
-        });
-        
-        $.get('/api/charts/yearly-comparison', function(data) {
-            if (data) {
-                Plotly.newPlot('yearly-comparison-chart', JSON.parse(data).data, JSON.parse(data).layout);
-            } else {
-                $('#yearly-comparison-chart').html('<p class="text-center text-muted">No yearly data available</p>');
-            }
-        });
-        
-        $.get('/api/charts/enhanced-benchmark', function(data) {
-            if (data) {
-                Plotly.newPlot('enhanced-benchmark-chart', JSON.parse(data).data, JSON.parse(data).layout);
-            } else {
-                $('#enhanced-benchmark-chart').html('<p class="text-center text-muted">No benchmark data available</p>');
-            }
-        });
-        
-        $.get('/api/charts/benchmark-comparison', function(data) {
-            if (data) {
-                Plotly.newPlot('benchmark-comparison-chart', JSON.parse(data).data, JSON.parse(data).layout);
-            } else {
-                $('#benchmark-comparison-chart').html('<p class="text-center text-muted">No benchmark data available</p>');
-            }
-        });
-        
-        // Load benchmark details
-        $.get('/api/benchmarks', function(data) {
-            const tbody = $('#benchmark-tbody');
-            tbody.empty();
-            
-            data.forEach(function(benchmark) {
-                tbody.append(`
-                    <tr>
-                        <td>${benchmark.category}</td>
-                        <td>${benchmark.actual_spend}</td>
-                        <td>${benchmark.benchmark_low}</td>
-                        <td>${benchmark.benchmark_high}</td>
-                        <td>${benchmark.benchmark_typical}</td>
-                        <td>${benchmark.variance_percentage}</td>
-                        <td>${benchmark.status}</td>
-                        <td>${benchmark.percentage_of_total}</td>
-                    </tr>
-                `);
-            });
-        });
-        
-        // Load recommendations
-        $.get('/api/recommendations', function(data) {
-            const tbody = $('#recommendations-tbody');
-            tbody.empty();
-            
-            data.forEach(function(rec) {
-                const categoryVendorCompany = rec.category || rec.vendor || rec.company || 'N/A';
-                tbody.append(`
-                    <tr>
-                        <td>${rec.type}</td>
-                        <td>${categoryVendorCompany}</td>
-                        <td><span class="badge bg-${rec.priority === 'High' ? 'danger' : rec.priority === 'Medium' ? 'warning' : 'success'}">${rec.priority}</span></td>
-                        <td>${rec.message}</td>
-                        <td>${rec.potential_savings}</td>
-                    </tr>
-                `);
-            });
-        });
-        
-        // Load AI-enhanced insights
-        $.get('/api/ai-insights', function(data) {
-            // Load AI categorizations
-            const catTbody = $('#ai-categorizations-tbody');
-            catTbody.empty();
-            
-            data.ai_categorizations.forEach(function(cat) {
-                catTbody.append(`
-                    <tr>
-                        <td>${cat.vendor}</td>
-                        <td>${cat.category}</td>
-                        <td>${cat.subcategory}</td>
-                        <td>${cat.service_type}</td>
-                        <td>${cat.complexity_level}</td>
-                    </tr>
-                `);
-            });
-            
-            // Load hidden costs
-            const hiddenCostsTbody = $('#hidden-costs-tbody');
-            hiddenCostsTbody.empty();
-            
-            const costFrequency = {};
-            data.hidden_costs.forEach(function(cost) {
-                costFrequency[cost] = (costFrequency[cost] || 0) + 1;
-            });
-            
-            Object.entries(costFrequency).forEach(function([cost, frequency]) {
-                hiddenCostsTbody.append(`
-                    <tr>
-                        <td>${cost}</td>
-                        <td>${frequency}</td>
-                    </tr>
-                `);
-            });
-            
-            // Load MSP services
-            const mspTbody = $('#msp-services-tbody');
-            mspTbody.empty();
-            
-            data.msp_analysis.forEach(function(msp) {
-                mspTbody.append(`
-                    <tr>
-                        <td>${msp.vendor}</td>
-                        <td>${msp.services.join(', ')}</td>
-                    </tr>
-                `);
-            });
-        });
-        
-        // Load AI-enhanced chart
-        $.get('/api/charts/ai-enhanced', function(data) {
-            if (data) {
-                Plotly.newPlot('ai-enhanced-chart', JSON.parse(data).data, JSON.parse(data).layout);
-            } else {
-                $('#ai-enhanced-chart').html('<p class="text-center text-muted">No AI-enhanced data available</p>');
-            }
-        });
-        
-        // Auto-refresh every 30 seconds
-        setInterval(function() {
-            location.reload();
-        }, 30000);
-    </script>
-</body>
-</html>
-    """
-    
-    with open(f"{template_dir}/dashboard.html", 'w') as f:
-        f.write(html_content)
-
 def main():
     """Start the dashboard server."""
-    print("Creating interactive dashboard...")
-    
-    # Create template
-    create_dashboard_template()
-    
-    print("Dashboard template created")
     print("Starting dashboard server...")
     print("Dashboard will be available at: http://localhost:5000")
-    print("Auto-refresh every 30 seconds")
+    print(f"Checking report files for changes every {REFRESH_INTERVAL_SECONDS:g} seconds")
+    print(f"Open pages refresh every {PAGE_POLL_SECONDS} seconds")
     print("Press Ctrl+C to stop the server")
     
+    # Serve with gunicorn's gevent workers where available; the Flask
+    # development server is for debugging (DASHBOARD_DEBUG=1) and Windows
+    debug = os.environ.get("DASHBOARD_DEBUG") == "1"
+    if not debug and os.name != "nt" and shutil.which("gunicorn"):
+        app_dir = os.path.dirname(os.path.abspath(__file__))
+        os.execvp("gunicorn", ["gunicorn", "--chdir", app_dir,
+                               "-c", os.path.join(app_dir, "gunicorn_conf.py"), "dashboard:app"])
+    
     # Start Flask server
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    app.run(debug=debug, host='0.0.0.0', port=5000)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
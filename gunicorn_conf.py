@@ -0,0 +1,19 @@
+"""
+Gunicorn settings for the dashboard
+Run with: gunicorn -c gunicorn_conf.py dashboard:app
+"""
+
+import os
+
+bind = os.environ.get("DASHBOARD_BIND", "0.0.0.0:5000")
+
+# The endpoints serve cached JSON, so one worker multiplexes many concurrent
+# requests on greenlets. The loaded data and its refresh thread are per
+# process, so every extra worker repeats the full load and the 5s polling.
+worker_class = "gevent"
+workers = int(os.environ.get("DASHBOARD_WORKERS", "1"))
+worker_connections = 1000
+
+# The gevent worker monkey-patches before it imports the app; preloading
+# would import Flask and friends unpatched in the master process
+preload_app = False
@@ -5,7 +5,6 @@ Central script for running common analysis operations
 """
 
 import sys
-import subprocess
 from pathlib import Path
 
 def run_analysis(analysis_type):
@@ -35,13 +34,30 @@ def run_analysis(analysis_type):
         return False
     
     print(f"Running {analysis_type} analysis...")
+    import runpy
+    
+    # Run the script in this interpreter rather than starting a second one,
+    # with the argv and import path it would see if run directly
+    saved_argv, saved_path = sys.argv, sys.path[:]
+    sys.argv = [str(script_path)]
+    sys.path.insert(0, str(script_path.parent))
     try:
-        result = subprocess.run([sys.executable, str(script_path)], check=True)
-        print(f"{analysis_type} analysis completed successfully!")
-        return True
-    except subprocess.CalledProcessError as e:
+        runpy.run_path(str(script_path), run_name="__main__")
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            print(f"{analysis_type} analysis failed: exit status {e.code}")
+            return False
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
         print(f"{analysis_type} analysis failed: {e}")
         return False
+    finally:
+        sys.argv = saved_argv
+        sys.path[:] = saved_path
+    
+    print(f"{analysis_type} analysis completed successfully!")
+    return True
 
 def main():
     """Main function."""
@@ -4,15 +4,18 @@ AI-Enhanced Executive Report Generator
 Creates a human-readable executive report from the AI-enhanced analysis data
 """
 
-import json
+import heapq
 import os
 from datetime import datetime
-from collections import defaultdict
+from collections import Counter
+import orjson
 
 class AIEnhancedExecutiveReport:
     def __init__(self):
         self.ai_data_file = "reports/current/ai_enhanced_industry_analysis_20250725.json"
         self.output_file = "reports/current/ai_enhanced_executive_summary_20250725.md"
+        # fsync the report before and after it replaces the old one; turn off for quick local runs
+        self.durable = True
         
     def load_ai_data(self):
         """Load the AI-enhanced analysis data."""
@@ -20,8 +23,8 @@ class AIEnhancedExecutiveReport:
             print(f"Error: AI-enhanced data file not found: {self.ai_data_file}")
             return None
             
-        with open(self.ai_data_file, 'r') as f:
-            return json.load(f)
+        with open(self.ai_data_file, 'rb') as f:
+            return orjson.loads(f.read())
     
     def generate_executive_summary(self, data):
         """Generate a comprehensive executive summary."""
@@ -34,53 +37,64 @@ class AIEnhancedExecutiveReport:
         total_spend = summary.get('total_spend', 0)
         total_records = summary.get('total_records', 0)
         
-        # Analyze benchmarks
-        above_benchmark = [b for b in benchmarks if b.get('status') == 'Above Benchmark']
-        below_benchmark = [b for b in benchmarks if b.get('status') == 'Below Benchmark']
-        at_benchmark = [b for b in benchmarks if b.get('status') == 'At Benchmark']
-        
-        # Calculate potential savings
-        potential_savings = sum(b.get('potential_savings', 0) for b in above_benchmark)
+        # Analyze benchmarks in a single pass
+        above_benchmark = []
+        below_benchmark = []
+        at_benchmark = []
+        status_buckets = {
+            'Above Benchmark': above_benchmark,
+            'Below Benchmark': below_benchmark,
+            'At Benchmark': at_benchmark
+        }
+        potential_savings = 0
+        vendor_analysis = {}
+        ai_categories = {}
+        hidden_costs = Counter()
+        msp_services = Counter()
         
-        # Group by vendor
-        vendor_analysis = defaultdict(lambda: {'total_spend': 0, 'items': [], 'above_benchmark': 0})
         for benchmark in benchmarks:
-            vendor = benchmark.get('vendor', 'Unknown')
+            status = benchmark.get('status')
             amount = benchmark.get('actual_spend', 0)
-            vendor_analysis[vendor]['total_spend'] += amount
-            vendor_analysis[vendor]['items'].append(benchmark)
-            if benchmark.get('status') == 'Above Benchmark':
-                vendor_analysis[vendor]['above_benchmark'] += 1
-        
-        # Top vendors by spend
-        top_vendors = sorted(vendor_analysis.items(), key=lambda x: x[1]['total_spend'], reverse=True)[:10]
-        
-        # AI categorizations analysis
-        ai_categories = defaultdict(lambda: {'count': 0, 'total_spend': 0})
-        for benchmark in benchmarks:
-            ai_cat = benchmark.get('ai_categorization', {})
-            if ai_cat:
-                category = ai_cat.get('primary_category', 'Unknown')
-                ai_categories[category]['count'] += 1
-                ai_categories[category]['total_spend'] += benchmark.get('actual_spend', 0)
-        
-        # Hidden costs analysis
-        hidden_costs = defaultdict(int)
-        for benchmark in benchmarks:
-            ai_cat = benchmark.get('ai_categorization', {})
+            
+            # Group by vendor
+            vendor_name = benchmark.get('vendor', 'Unknown')
+            vendor = vendor_analysis.get(vendor_name)
+            if vendor is None:
+                vendor = vendor_analysis[vendor_name] = {'total_spend': 0, 'items': [], 'above_benchmark': 0,
+                                                         'potential_savings': 0}
+            vendor['total_spend'] += amount
+            vendor['items'].append(benchmark)
+            
+            bucket = status_buckets.get(status)
+            if bucket is not None:
+                bucket.append(benchmark)
+                if bucket is above_benchmark:
+                    savings = benchmark.get('potential_savings', 0)
+                    potential_savings += savings
+                    vendor['above_benchmark'] += 1
+                    vendor['potential_savings'] += savings
+            
+            # AI categorizations, hidden costs and MSP services
+            ai_cat = benchmark.get('ai_categorization')
             if ai_cat:
-                costs = ai_cat.get('hidden_costs', [])
-                for cost in costs:
-                    hidden_costs[cost] += 1
+                category_name = ai_cat.get('primary_category', 'Unknown')
+                category = ai_categories.get(category_name)
+                if category is None:
+                    category = ai_categories[category_name] = {'count': 0, 'total_spend': 0}
+                category['count'] += 1
+                category['total_spend'] += amount
+                hidden_costs.update(ai_cat.get('hidden_costs', ()))
+                msp_services.update(ai_cat.get('msp_services', ()))
+        
+        # Recommendations the report lists, by priority
+        recommendations_by_priority = {'High': [], 'Medium': []}
+        for rec in recommendations:
+            priority_recs = recommendations_by_priority.get(rec.get('priority'))
+            if priority_recs is not None:
+                priority_recs.append(rec)
         
-        # MSP services analysis
-        msp_services = defaultdict(int)
-        for benchmark in benchmarks:
-            ai_cat = benchmark.get('ai_categorization', {})
-            if ai_cat:
-                services = ai_cat.get('msp_services', [])
-                for service in services:
-                    msp_services[service] += 1
+        # Top vendors by spend
+        top_vendors = heapq.nlargest(10, vendor_analysis.items(), key=lambda x: x[1]['total_spend'])
         
         return {
             'summary': summary,
@@ -95,13 +109,23 @@ class AIEnhancedExecutiveReport:
             'ai_categories': ai_categories,
             'hidden_costs': hidden_costs,
             'msp_services': msp_services,
-            'recommendations': recommendations
+            'recommendations': recommendations,
+            'recommendations_by_priority': recommendations_by_priority
         }
     
     def create_markdown_report(self, analysis):
         """Create a human-readable markdown report."""
         
-        report = f"""# AI-Enhanced Executive Summary Report
+        parts = []
+        append = parts.append
+        
+        # Item counts used by several summary lines
+        total_records = analysis['total_records']
+        above_count = len(analysis['above_benchmark'])
+        at_count = len(analysis['at_benchmark'])
+        below_count = len(analysis['below_benchmark'])
+        
+        append(f"""# AI-Enhanced Executive Summary Report
 
 **Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 **Analysis Period:** 2024-2025
@@ -111,117 +135,111 @@ class AIEnhancedExecutiveReport:
 
 ### Key Metrics
 - **Total Spend Analyzed:** ${analysis['total_spend']:,.2f}
-- **Total Records:** {analysis['total_records']:,}
+- **Total Records:** {total_records:,}
 - **Potential Savings Identified:** ${analysis['potential_savings']:,.2f}
-- **Above Benchmark Items:** {len(analysis['above_benchmark'])}
-- **Below Benchmark Items:** {len(analysis['below_benchmark'])}
+- **Above Benchmark Items:** {above_count}
+- **Below Benchmark Items:** {below_count}
 
 ### Benchmark Performance
-- **Above Benchmark:** {len(analysis['above_benchmark'])} items ({(len(analysis['above_benchmark'])/analysis['total_records']*100):.1f}%)
-- **At Benchmark:** {len(analysis['at_benchmark'])} items ({(len(analysis['at_benchmark'])/analysis['total_records']*100):.1f}%)
-- **Below Benchmark:** {len(analysis['below_benchmark'])} items ({(len(analysis['below_benchmark'])/analysis['total_records']*100):.1f}%)
+- **Above Benchmark:** {above_count} items ({above_count / total_records * 100:.1f}%)
+- **At Benchmark:** {at_count} items ({at_count / total_records * 100:.1f}%)
+- **Below Benchmark:** {below_count} items ({below_count / total_records * 100:.1f}%)
 
 ## Top Vendors by Spend
 
-"""
+""")
         
         for vendor, data in analysis['top_vendors']:
-            report += f"- **{vendor}**: ${data['total_spend']:,.2f} ({data['above_benchmark']} items above benchmark)\n"
+            append(f"- **{vendor}**: ${data['total_spend']:,.2f} ({data['above_benchmark']} items above benchmark)\n")
         
-        report += f"""
+        append(f"""
 ## Critical Findings
 
 ### Items Significantly Above Benchmark
-"""
+""")
         
         # Show top 10 above benchmark items
-        top_above = sorted(analysis['above_benchmark'], key=lambda x: x.get('variance_percentage', 0), reverse=True)[:10]
+        top_above = heapq.nlargest(10, analysis['above_benchmark'], key=lambda x: x.get('variance_percentage', 0))
         
         for item in top_above:
             vendor = item.get('vendor', 'Unknown')
             amount = item.get('actual_spend', 0)
             variance = item.get('variance_percentage', 0)
             category = item.get('category', 'Unknown')
-            ai_cat = item.get('ai_categorization', {})
+            ai_cat = item.get('ai_categorization')
             primary_cat = ai_cat.get('primary_category', 'Unknown') if ai_cat else 'Unknown'
             
-            report += f"- **{vendor}** ({primary_cat}): ${amount:,.2f} (**{variance:+.1f}%** above benchmark)\n"
+            append(f"- **{vendor}** ({primary_cat}): ${amount:,.2f} (**{variance:+.1f}%** above benchmark)\n")
         
-        report += f"""
+        append(f"""
 ## AI-Enhanced Insights
 
 ### Service Categories Identified
-"""
+""")
         
         # Top AI categories by spend
-        top_categories = sorted(analysis['ai_categories'].items(), key=lambda x: x[1]['total_spend'], reverse=True)[:10]
+        top_categories = heapq.nlargest(10, analysis['ai_categories'].items(), key=lambda x: x[1]['total_spend'])
         
         for category, data in top_categories:
-            report += f"- **{category}**: ${data['total_spend']:,.2f} ({data['count']} items)\n"
+            append(f"- **{category}**: ${data['total_spend']:,.2f} ({data['count']} items)\n")
         
-        report += f"""
+        append(f"""
 ### Hidden Costs Identified
-"""
+""")
         
         if analysis['hidden_costs']:
-            for cost, count in sorted(analysis['hidden_costs'].items(), key=lambda x: x[1], reverse=True):
-                report += f"- **{cost}**: Found in {count} invoices\n"
+            for cost, count in analysis['hidden_costs'].most_common():
+                append(f"- **{cost}**: Found in {count} invoices\n")
         else:
-            report += "- No specific hidden costs identified\n"
+            append("- No specific hidden costs identified\n")
         
-        report += f"""
+        append(f"""
 ### MSP Services Breakdown
-"""
+""")
         
         if analysis['msp_services']:
-            for service, count in sorted(analysis['msp_services'].items(), key=lambda x: x[1], reverse=True):
-                report += f"- **{service}**: {count} instances\n"
+            for service, count in analysis['msp_services'].most_common():
+                append(f"- **{service}**: {count} instances\n")
         else:
-            report += "- No specific MSP services identified\n"
+            append("- No specific MSP services identified\n")
         
-        report += f"""
+        append(f"""
 ## Strategic Recommendations
 
 ### Immediate Actions (High Priority)
-"""
+""")
         
-        high_priority = [r for r in analysis['recommendations'] if r.get('priority') == 'High']
-        for rec in high_priority[:5]:
+        for rec in analysis['recommendations_by_priority']['High'][:5]:
             vendor = rec.get('vendor', 'Unknown')
             message = rec.get('message', 'No message')
             savings = rec.get('potential_savings', 'Unknown')
-            report += f"- **{vendor}**: {message} (Potential savings: {savings})\n"
+            append(f"- **{vendor}**: {message} (Potential savings: {savings})\n")
         
-        report += f"""
+        append(f"""
 ### Medium-Term Optimizations
-"""
+""")
         
-        medium_priority = [r for r in analysis['recommendations'] if r.get('priority') == 'Medium']
-        for rec in medium_priority[:5]:
+        for rec in analysis['recommendations_by_priority']['Medium'][:5]:
             vendor = rec.get('vendor', 'Unknown')
             message = rec.get('message', 'No message')
             savings = rec.get('potential_savings', 'Unknown')
-            report += f"- **{vendor}**: {message} (Potential savings: {savings})\n"
+            append(f"- **{vendor}**: {message} (Potential savings: {savings})\n")
         
-        report += f"""
+        append(f"""
 ## Cost Optimization Opportunities
 
 ### By Vendor
-"""
+""")
         
         # Vendors with highest potential savings
-        vendors_with_savings = []
-        for vendor, data in analysis['vendor_analysis'].items():
-            vendor_savings = sum(item.get('potential_savings', 0) for item in data['items'] if item.get('status') == 'Above Benchmark')
-            if vendor_savings > 0:
-                vendors_with_savings.append((vendor, vendor_savings))
+        vendors_with_savings = [(vendor, data['potential_savings'])
+                                for vendor, data in analysis['vendor_analysis'].items()
+                                if data['potential_savings'] > 0]
         
-        vendors_with_savings.sort(key=lambda x: x[1], reverse=True)
+        for vendor, savings in heapq.nlargest(10, vendors_with_savings, key=lambda x: x[1]):
+            append(f"- **{vendor}**: ${savings:,.2f} potential savings\n")
         
-        for vendor, savings in vendors_with_savings[:10]:
-            report += f"- **{vendor}**: ${savings:,.2f} potential savings\n"
-        
-        report += f"""
+        append(f"""
 ## Next Steps
 
 1. **Immediate Review**: Focus on items 50%+ above benchmark
@@ -233,15 +251,15 @@ class AIEnhancedExecutiveReport:
 ## Technical Notes
 
 - **AI Models Used**: Claude 3.5 Haiku (categorization), Claude Opus 4 (analysis)
-- **Data Quality**: {analysis['total_records']} records processed with AI enhancement
+- **Data Quality**: {total_records} records processed with AI enhancement
 - **Benchmark Sources**: Industry-standard benchmarks for IT services and software
 - **Analysis Date**: {datetime.now().strftime('%Y-%m-%d')}
 
 ---
 *Report generated by AI-Enhanced Licensing Analysis System*
-"""
+""")
         
-        return report
+        return "".join(parts)
     
     def generate_report(self):
         """Generate the complete executive report."""
@@ -259,8 +277,7 @@ class AIEnhancedExecutiveReport:
         report = self.create_markdown_report(analysis)
         
         # Save the report
-        with open(self.output_file, 'w', encoding='utf-8') as f:
-            f.write(report)
+        self.save_report(report)
         
         print(f"✅ AI-Enhanced Executive Report generated successfully!")
         print(f"📄 Report saved to: {self.output_file}")
@@ -268,6 +285,24 @@ class AIEnhancedExecutiveReport:
         print(f"📊 Items above benchmark: {len(analysis['above_benchmark'])}")
         
         return True
+    
+    def save_report(self, report):
+        """Write the report atomically, so an interrupted run never leaves a truncated file."""
+        temp_file = self.output_file + ".tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            f.write(report)
+            if self.durable:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temp_file, self.output_file)
+        
+        # Persist the rename itself (directories can't be opened on Windows)
+        if self.durable and hasattr(os, 'O_DIRECTORY'):
+            dir_fd = os.open(os.path.dirname(self.output_file) or '.', os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
 
 def main():
     """Main function to generate the AI-enhanced executive report."""
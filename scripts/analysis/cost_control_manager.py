@@ -8,6 +8,7 @@ import json
 import hashlib
 import time
 import sqlite3
+import threading
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List, Tuple
 import logging
@@ -426,6 +427,16 @@ class CostControlManager:
         
         return recommendations
 
+_cost_control_manager: Optional[CostControlManager] = None
+_cost_control_manager_lock = threading.Lock()
+
 def get_cost_control_manager() -> CostControlManager:
-    """Get a configured cost control manager instance."""
-    return CostControlManager() 
\ No newline at end of file
+    """Get the process-wide cost control manager, creating it on first use."""
+    global _cost_control_manager
+    # Shared so every analyzer updates the same in-memory metrics instead of
+    # each instance saving its own stale counters
+    if _cost_control_manager is None:
+        with _cost_control_manager_lock:
+            if _cost_control_manager is None:
+                _cost_control_manager = CostControlManager()
+    return _cost_control_manager
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Vendor Name Consolidation
+Shared vendor consolidation rules, so the dashboard and the AI-enhanced analyzer group invoices under the same names
+"""
+
+import re
+
+# Vendor consolidation rules
+VENDOR_MAPPINGS = {
+    'synoptek': 'Synoptek',
+    'synoptek, llc': 'Synoptek',
+    'synoptek llc': 'Synoptek',
+    'atlassian': 'Atlassian',
+    'microsoft': 'Microsoft',
+    'oracle': 'Oracle',
+    'salesforce': 'Salesforce',
+    'aws': 'AWS',
+    'amazon': 'AWS',
+    'amazon web services': 'AWS',
+    'azure': 'Microsoft Azure',
+    'google': 'Google',
+    'gcp': 'Google Cloud',
+    'google cloud': 'Google Cloud',
+    'github': 'GitHub',
+    'gitlab': 'GitLab',
+    'crowdstrike': 'CrowdStrike',
+    'sentinelone': 'SentinelOne',
+    'palo alto': 'Palo Alto Networks',
+    'proofpoint': 'Proofpoint',
+    'harman': 'Harman',
+    'harman connected services': 'Harman',
+    'markov': 'Markov Processes',
+    'markov processes': 'Markov Processes',
+    'markov processes international': 'Markov Processes'
+}
+
+# Longest keys first, so 'google cloud' wins over 'google' where both match
+_VENDOR_KEY_RE = re.compile('|'.join(map(re.escape, sorted(VENDOR_MAPPINGS, key=len, reverse=True))))
+
+def consolidate_vendor_name(vendor_name):
+    """Consolidate vendor names to handle variations."""
+    # One scan covers exact and partial matches: the earliest match wins,
+    # and the longest key among those starting at the same position
+    match = _VENDOR_KEY_RE.search(vendor_name.lower().strip())
+    if match:
+        return VENDOR_MAPPINGS[match.group()]
+    
+    # Return original name if no match found
+    return vendor_name